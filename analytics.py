@@ -0,0 +1,129 @@
+from functools import cached_property
+
+import numpy as np
+
+
+class ScheduleAnalytics:
+    """
+    Per-staff and per-week metrics of one solved schedule.
+
+    Everything is computed with NumPy from the (staff, day, shift type)
+    assignment array, once, the first time it is asked for. HealthcareSchedule
+    keeps one instance per solution (see HealthcareSchedule.analytics), so all
+    reports share the same numbers instead of re-summing the PuLP variables.
+
+    Parameters:
+    assignment (ndarray): 0/1 array of shape (staff, num_weeks * days_per_week, shift types).
+    staff_info (dict): Staff members in the same order as the assignment rows.
+    shift_hours (dict): Shift types in the same order as the assignment columns.
+    days_per_week (int): Days per week of the schedule.
+    max_hours_full_time (float): Yearly hours of a 100% position.
+    """
+
+    def __init__(self, assignment, staff_info, shift_hours, days_per_week, max_hours_full_time):
+        self.assignment = assignment
+        self.staff = list(staff_info)
+        self.staff_info = staff_info
+        self.shift_types = list(shift_hours)
+        self.shift_hours = shift_hours
+        self.days_per_week = days_per_week
+        self.num_weeks = assignment.shape[1] // days_per_week
+        self.max_hours_full_time = max_hours_full_time
+
+    @cached_property
+    def daily_hours(self):
+        # Hours worked per staff member and day
+        return self.assignment @ np.array([self.shift_hours[shift_type] for shift_type in self.shift_types], dtype=float)
+
+    @cached_property
+    def worked(self):
+        # Whether each staff member works on each day
+        return self.assignment.any(axis=2)
+
+    @cached_property
+    def shift_index(self):
+        # Index of the shift type worked per staff member and day, -1 for days off
+        return np.where(self.worked, self.assignment.argmax(axis=2), -1)
+
+    @cached_property
+    def weekly_hours(self):
+        return self.daily_hours.reshape(len(self.staff), self.num_weeks, self.days_per_week).sum(axis=2)
+
+    @cached_property
+    def hours(self):
+        return self.daily_hours.sum(axis=1)
+
+    @cached_property
+    def expected_hours(self):
+        return np.array([info["work_percentage"] / 100 * self.max_hours_full_time for info in self.staff_info.values()])
+
+    @cached_property
+    def hours_deviation(self):
+        # Positive when someone works more than their work_percentage target
+        return self.hours - self.expected_hours
+
+    @cached_property
+    def weekends_worked(self):
+        # Weeks in which Saturday (5) or Sunday (6) is worked
+        weeks = self.worked.reshape(len(self.staff), self.num_weeks, self.days_per_week)
+        return weeks[:, :, 5:7].any(axis=2).sum(axis=1)
+
+    @cached_property
+    def isolated_work_days(self):
+        # Worked days with a day off on both sides
+        padded = np.pad(self.worked, ((0, 0), (1, 1)))
+        return (self.worked & ~padded[:, :-2] & ~padded[:, 2:]).sum(axis=1)
+
+    @cached_property
+    def isolated_off_days(self):
+        # Days off with work on both sides
+        padded = np.pad(self.worked, ((0, 0), (1, 1)))
+        return (~self.worked & padded[:, :-2] & padded[:, 2:]).sum(axis=1)
+
+    @cached_property
+    def runs(self):
+        # (start day, length) of every run of consecutive worked days per staff member
+        padded = np.pad(self.worked.astype(np.int8), ((0, 0), (1, 1)))
+        edges = np.diff(padded, axis=1)
+        runs = []
+        for starts, ends in ((np.nonzero(row == 1)[0], np.nonzero(row == -1)[0]) for row in edges):
+            runs.append(list(zip(starts.tolist(), (ends - starts).tolist())))
+        return runs
+
+    @cached_property
+    def longest_run(self):
+        return np.array([max((length for _, length in runs), default=0) for runs in self.runs])
+
+    @cached_property
+    def gaps(self):
+        # (day, next worked day, gap in days) between consecutive worked days per staff member
+        gaps = []
+        for worked in self.worked:
+            days = np.nonzero(worked)[0]
+            gaps.append([(day, next_day, next_day - day) for day, next_day in zip(days[:-1].tolist(), days[1:].tolist())])
+        return gaps
+
+    @cached_property
+    def gap_histogram(self):
+        # Number of gaps of each length (in days) per staff member
+        histograms = []
+        for gaps in self.gaps:
+            lengths, counts = np.unique(np.array([gap for _, _, gap in gaps], dtype=int), return_counts=True)
+            histograms.append(dict(zip(lengths.tolist(), counts.tolist())))
+        return histograms
+
+    def shift_labels(self, off=""):
+        # Shift type worked per staff member and day, off for days off
+        labels = np.array(self.shift_types + [off], dtype=object)
+        return labels[self.shift_index]  # -1 picks the trailing off label
+
+    def kpi_summary(self):
+        # A few headline numbers to compare schedules by
+        return {
+            "hours": dict(zip(self.staff, self.hours.tolist())),
+            "max_hours_deviation": float(np.abs(self.hours_deviation).max()),
+            "isolated_days": int(self.isolated_work_days.sum() + self.isolated_off_days.sum()),
+            "min_weekends_worked": int(self.weekends_worked.min()),
+            "max_weekends_worked": int(self.weekends_worked.max()),
+            "longest_run": int(self.longest_run.max()),
+        }
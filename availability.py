@@ -0,0 +1,107 @@
+import datetime
+import os
+
+import numpy as np
+
+
+# Cell values of an availability matrix: free to schedule, unavailable, or the index of a pinned shift type
+FREE = -1
+OFF = -2
+
+# Spellings of an unavailable day in availability files (compared lower case)
+OFF_CODES = ("off", "x", "v", "vacation", "ferie", "fri", "0", "-")
+
+# First day of the schedule, as in the reports
+START_DATE = datetime.date(2024, 1, 1)
+
+
+def load_availability(path, staff_info, shift_hours, num_days, start_date=START_DATE):
+    """
+    Loads a per-staff, per-day availability and pin matrix from a CSV or Excel file.
+
+    The file has one row per staff member (names in the first column) and one
+    column per date (2024-03-01) or day index (0 is the first day). Empty
+    cells are free, cells with an OFF_CODES value (off, x, vacation, ...) are
+    days the staff member can't work, and cells with a shift type (D1, Night,
+    ...) pin that shift. Staff members without a row are free every day and
+    columns outside the schedule are ignored.
+
+    Returns:
+    ndarray: int16 array of shape (staff, num_days) with FREE, OFF or the
+    index of the pinned shift type in shift_hours.
+    """
+    import pandas as pd
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        table = pd.read_csv(path, index_col=0, dtype=str)
+    elif extension in (".xlsx", ".xls"):
+        table = pd.read_excel(path, index_col=0, dtype=str)
+    else:
+        raise ValueError(f"Unsupported availability file: {path}")
+
+    return _table_to_matrix(table, staff_info, shift_hours, num_days, start_date, path)
+
+
+def availability_from_table(table, staff_info, shift_hours, num_days, start_date=START_DATE):
+    """
+    Builds the availability matrix from an inline table instead of a file.
+
+    The table maps staff names to {date or day index: value} with the same
+    values as the files of load_availability, e.g.
+    {"Nina": {"2024-03-01": "off", "60": "D2"}}.
+
+    Returns:
+    ndarray: int16 array of shape (staff, num_days), as load_availability.
+    """
+    import pandas as pd
+
+    if not isinstance(table, dict) or not all(isinstance(days, dict) for days in table.values()):
+        raise ValueError("An availability table maps every staff member to {date or day index: value}")
+    frame = pd.DataFrame.from_dict(table, orient="index", dtype=str)
+    return _table_to_matrix(frame, staff_info, shift_hours, num_days, start_date, "the availability table")
+
+
+def day_label(day_index, start_date=START_DATE):
+    return (start_date + datetime.timedelta(days=int(day_index))).isoformat()
+
+
+def _table_to_matrix(table, staff_info, shift_hours, num_days, start_date, source):
+    # Staff rows by date or day index columns of availability values, as read from a file or an inline table
+    staff_index = {name.strip(): i for i, name in enumerate(staff_info)}
+    unknown_staff = [name for name in table.index if str(name).strip() not in staff_index]
+    if unknown_staff:
+        raise ValueError(f"Unknown staff in {source}: {', '.join(map(str, unknown_staff))}")
+
+    days = np.array([_day_index(column, start_date) for column in table.columns])
+    in_range = (days >= 0) & (days < num_days)
+
+    # Translate every distinct cell value once instead of cell by cell
+    codes = {"": FREE, "nan": FREE, **{code: OFF for code in OFF_CODES},
+             **{shift_type.lower(): i for i, shift_type in enumerate(shift_hours)}}
+    cells = table.fillna("").to_numpy(dtype=str)
+    values, inverse = np.unique(np.char.lower(np.char.strip(cells)), return_inverse=True)
+    unknown_values = [value for value in values if value not in codes]
+    if unknown_values:
+        raise ValueError(f"Unknown availability values in {source}: {', '.join(unknown_values)}")
+    cells = np.array([codes[value] for value in values], dtype=np.int16)[inverse].reshape(cells.shape)
+
+    availability = np.full((len(staff_info), num_days), FREE, dtype=np.int16)
+    rows = [staff_index[str(name).strip()] for name in table.index]
+    availability[np.ix_(rows, days[in_range])] = cells[:, in_range]
+    return availability
+
+
+def _day_index(column, start_date):
+    # Column headers are dates (text, or datetimes from Excel) or plain day indices
+    if isinstance(column, datetime.datetime):
+        column = column.date()
+    if isinstance(column, datetime.date):
+        return (column - start_date).days
+    column = str(column).strip()
+    if column.lstrip("-").isdigit():
+        return int(column)
+    try:
+        return (datetime.date.fromisoformat(column[:10]) - start_date).days
+    except ValueError:
+        raise ValueError(f"Availability column {column!r} is neither a date nor a day index") from None
@@ -0,0 +1,125 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from healthcare_schedule import HealthcareSchedule
+from reporting import FILE_OUTPUTS
+from rosters import find_roster_files, load_roster
+
+
+def schedule_roster(roster, output_dir, backend="cbc", time_limit=None, reports=()):
+    """
+    Builds and solves one roster and writes its result files.
+
+    Runs in a worker process, so it only takes and returns plain data. The
+    solve and the file reports ("excel", "plot") print nothing, the batch
+    prints one summary line per roster. The reports are rendered serially,
+    since the batch already runs one roster per process.
+
+    Returns:
+    dict: Summary with the roster name, solver status, objective and wall time.
+    """
+    start = time.perf_counter()
+    schedule = HealthcareSchedule(num_weeks=roster["num_weeks"], days_per_week=roster["days_per_week"],
+                                  staff_info=roster["staff_info"], shift_hours=roster["shift_hours"],
+                                  availability=roster["availability"])
+    schedule.add_constraints()
+    schedule.set_objective()
+    # A time limit should still leave every roster with its best schedule so far
+    schedule.solve(backend=backend, time_limit=time_limit, msg=0, anytime=True, verbose=False)
+    wall_time = time.perf_counter() - start
+
+    summary = {
+        "name": roster["name"],
+        "status": schedule.solve_info["status"],
+        "objective": schedule.solve_info["objective"],
+        "gap": schedule.solve_info["gap"],
+        "wall_time": round(wall_time, 2),
+    }
+
+    result = dict(summary, schedule=schedule_to_dict(schedule))
+    with open(os.path.join(output_dir, f"{roster['name']}.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+
+    if reports:
+        schedule.generate_report(outputs=reports, parallel=False,
+                                 excel_path=os.path.join(output_dir, f"{roster['name']}.xlsx"),
+                                 plot_path=os.path.join(output_dir, f"{roster['name']}.png"))
+    return summary
+
+
+def schedule_to_dict(schedule):
+    # Shift worked per staff member and day ('' for days off), None without a solution
+    if schedule.assignment is None:
+        return None
+    return dict(zip(schedule.staff_info, schedule.analytics.shift_labels().tolist()))
+
+
+def run_batch(roster_files, output_dir, jobs=1, backend="cbc", time_limit=None, reports=()):
+    os.makedirs(output_dir, exist_ok=True)
+
+    # One broken roster should not take down the batch, whether it fails to load or to solve
+    summaries = [None] * len(roster_files)
+    rosters = {}
+    for index, path in enumerate(roster_files):
+        try:
+            rosters[index] = load_roster(path)
+        except Exception as error:
+            name = os.path.splitext(os.path.basename(path))[0]
+            summaries[index] = _error_summary(name, error)
+            _print_summary(summaries[index])
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(schedule_roster, roster, output_dir, backend, time_limit, reports): index
+                   for index, roster in rosters.items()}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                summaries[index] = future.result()
+            except Exception as error:
+                summaries[index] = _error_summary(rosters[index]["name"], error)
+            _print_summary(summaries[index])
+
+    # The summary keeps the input order
+    with open(os.path.join(output_dir, "summary.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "status", "objective", "gap", "wall_time"])
+        writer.writeheader()
+        writer.writerows(summaries)
+    return summaries
+
+
+def _error_summary(name, error):
+    return {"name": name, "status": f"Error: {error}", "objective": None, "gap": None, "wall_time": None}
+
+
+def _print_summary(summary):
+    print(f"{summary['name']}: {summary['status']} (objective {summary['objective']}, {summary['wall_time']}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schedule many rosters from JSON, YAML or CSV files.")
+    parser.add_argument("paths", nargs="+", help="Roster files or directories of roster files")
+    parser.add_argument("-o", "--output-dir", default="results", help="Where to write results and summary.csv")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Number of rosters solved in parallel")
+    parser.add_argument("-t", "--time-limit", type=float, default=None, help="Solver time limit per roster in seconds")
+    parser.add_argument("--backend", choices=["cbc", "highs"], default="cbc", help="Solver backend")
+    parser.add_argument("--reports", default="", help="Comma separated report files per roster: excel, plot")
+    parser.add_argument("--excel", action="store_true", help="Same as --reports excel")
+    args = parser.parse_args(argv)
+
+    reports = [report for report in args.reports.split(",") if report]
+    if args.excel and "excel" not in reports:
+        reports.append("excel")
+    unknown = set(reports) - set(FILE_OUTPUTS)
+    if unknown:
+        parser.error(f"unknown reports: {', '.join(sorted(unknown))}")
+
+    run_batch(find_roster_files(args.paths), args.output_dir, jobs=args.jobs, backend=args.backend,
+              time_limit=args.time_limit, reports=reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import csv
+import itertools
+import time
+
+import pulp
+
+from healthcare_schedule import HealthcareSchedule
+from rosters import find_roster_files, load_roster
+
+
+def solve_weighted(schedule, backend, time_limit):
+    # One solve of the weighted sum of all objective families
+    schedule.set_objective()
+    schedule.solve(backend=backend, time_limit=time_limit, msg=0, anytime=True)
+    return [schedule.problem.objective]
+
+
+def solve_lexicographic(schedule, backend, time_limit):
+    # One unit-weight solve per family, time_limit applies to each stage
+    schedule.solve_lexicographic(backend=backend, time_limit=time_limit, anytime=True)
+    return [pulp.lpSum(terms) for terms in schedule.objective_components.values()]
+
+
+# Benchmark mode name -> function solving a built schedule and returning the objectives it optimised
+MODES = {
+    "weighted": solve_weighted,
+    "lexicographic": solve_lexicographic,
+}
+
+
+def coefficient_range(objectives):
+    # Largest ratio between two objective coefficients the solver had to handle in one objective
+    ratios = []
+    for objective in objectives:
+        coefficients = [abs(coefficient) for coefficient in objective.values() if coefficient]
+        if coefficients:
+            ratios.append(max(coefficients) / min(coefficients))
+    return max(ratios, default=1.0)
+
+
+def benchmark_roster(roster, modes, backend="highs", time_limit=None, cuts=(False,)):
+    """
+    Builds and solves one roster once per mode, and per entry of cuts
+    without (False) or with (True) the derived valid inequalities.
+
+    Returns:
+    list: One row per mode with status, wall time, the unweighted value of
+    every objective family and the objective coefficient range. With HiGHS
+    also the LP relaxation bound, the final best bound and the node count.
+    """
+    rows = []
+    for mode, with_cuts in itertools.product(modes, cuts):
+        start = time.perf_counter()
+        schedule = HealthcareSchedule(num_weeks=roster["num_weeks"], days_per_week=roster["days_per_week"],
+                                      staff_info=roster["staff_info"], shift_hours=roster["shift_hours"],
+                                      availability=roster["availability"])
+        schedule.add_constraints()
+        if with_cuts:
+            try:
+                schedule.add_valid_inequalities()
+            except ValueError as error:
+                # A pool that can't cover its shifts makes the roster infeasible in every mode
+                rows.append({"roster": roster["name"], "mode": mode, "cuts": with_cuts, "status": f"Error: {error}"})
+                continue
+        build_time = time.perf_counter() - start
+        objectives = MODES[mode](schedule, backend, time_limit)
+
+        row = {
+            "roster": roster["name"],
+            "mode": mode,
+            "cuts": with_cuts,
+            "status": schedule.solve_info["status"],
+            "build_time": round(build_time, 2),
+            "solve_time": round(time.perf_counter() - start - build_time, 2),
+            "coefficient_range": f"{coefficient_range(objectives):.3g}",
+        }
+        if schedule.highs_model is not None:
+            # Bound of the LP relaxation of the weighted model, with or without the cuts
+            row["nodes"] = schedule.solve_info.get("nodes")
+            row["best_bound"] = schedule.solve_info["best_bound"]
+            row["root_bound"] = round(schedule.highs_model.relaxation_bound(), 6)
+        if schedule.assignment is not None:
+            row.update({family: round(value, 6) for family, value in schedule.objective_values().items()})
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare solve modes on roster files.")
+    parser.add_argument("paths", nargs="+", help="Roster files or directories of roster files")
+    parser.add_argument("-m", "--modes", default=",".join(MODES), help=f"Comma separated modes: {', '.join(MODES)}")
+    parser.add_argument("-t", "--time-limit", type=float, default=None,
+                        help="Solver time limit in seconds (per stage for lexicographic)")
+    parser.add_argument("--backend", choices=["cbc", "highs"], default="highs", help="Solver backend")
+    parser.add_argument("--cuts", choices=["off", "on", "both"], default="off",
+                        help="Solve without, with or both without and with the derived valid inequalities")
+    parser.add_argument("-o", "--output", default=None, help="Also write the results to this CSV file")
+    args = parser.parse_args(argv)
+
+    modes = [mode for mode in args.modes.split(",") if mode]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    cuts = {"off": (False,), "on": (True,), "both": (False, True)}[args.cuts]
+    rows = []
+    for path in find_roster_files(args.paths):
+        rows.extend(benchmark_roster(load_roster(path), modes, args.backend, args.time_limit, cuts))
+
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join(str(row.get(column, "")) for column in columns))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
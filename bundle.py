@@ -0,0 +1,134 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from analytics import ScheduleAnalytics
+
+
+# A model bundle is a directory with these three files; solve_bundle.py adds the solution file
+MANIFEST_FILE = "manifest.json"
+MODEL_FILE = "model.mps.gz"
+INDEX_FILE = "index.json.gz"
+SOLUTION_FILE = "solution.json.gz"
+BUNDLE_FORMAT = 1
+
+
+def export_bundle(schedule, directory):
+    """
+    Writes a built HealthcareSchedule as a self-contained model bundle.
+
+    The bundle holds the model as gzipped MPS (short X/C names), an index
+    that maps the MPS column names back to the PuLP variables and to the
+    (staff, day, shift type) assignment, and a manifest with the roster
+    parameters needed to report on a solution. It can be solved anywhere
+    with solve_bundle.py, without this code base or the roster.
+
+    Returns:
+    str: The bundle directory.
+    """
+    if schedule.problem.objective is None:
+        raise ValueError("The model has no objective yet, call set_objective() before exporting it")
+    os.makedirs(directory, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mps_path = os.path.join(tmp, "model.mps")
+        _, mps_names, _, _ = schedule.problem.writeMPS(mps_path, rename=True, with_objsense=True)
+        with open(mps_path, "rb") as source, gzip.open(os.path.join(directory, MODEL_FILE), "wb") as target:
+            shutil.copyfileobj(source, target)
+
+    index = {
+        "columns": {mps_name: name for name, mps_name in mps_names.items()},
+        # Column of every shift variable in assignment order (staff, day, shift type)
+        "shift_columns": [mps_names[var.name] for var in schedule.shifts.values()],
+    }
+    with gzip.open(os.path.join(directory, INDEX_FILE), "wt", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "model": MODEL_FILE,
+        "model_sha256": _sha256(os.path.join(directory, MODEL_FILE)),
+        "index": INDEX_FILE,
+        "sense": schedule.problem.sense,
+        "num_rows": len(schedule.problem.constraints),
+        "num_columns": len(mps_names),
+        "num_weeks": schedule.num_weeks,
+        "days_per_week": schedule.days_per_week,
+        "staff_info": schedule.staff_info,
+        "shift_hours": schedule.shift_hours,
+        "max_hours_full_time": schedule.MAX_HOURS_FULL_TIME * schedule.hours_scale,
+        "objective_weights": schedule.objective_weights,
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return directory
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format')} in {directory}")
+    return manifest
+
+
+def read_solution(directory, solution_path=None):
+    """
+    Reads a solution written by solve_bundle.py for the bundle in directory.
+
+    Returns:
+    tuple: (values, solve_info, manifest, index) with the column values by
+    MPS name and the solver status, objective, best bound and gap.
+    """
+    manifest = read_manifest(directory)
+    with gzip.open(solution_path or os.path.join(directory, SOLUTION_FILE), "rt", encoding="utf-8") as f:
+        solution = json.load(f)
+    if solution["model_sha256"] != manifest["model_sha256"]:
+        raise ValueError(f"The solution does not belong to the model in {directory}")
+    with gzip.open(os.path.join(directory, INDEX_FILE), "rt", encoding="utf-8") as f:
+        index = json.load(f)
+
+    optimal = solution["status"] == "Optimal"
+    has_solution = solution["status"] in ("Optimal", "Feasible")
+    solve_info = {"status": solution["status"], "optimal": optimal, "objective": solution["objective"],
+                  "best_bound": solution["objective"] if optimal else None, "gap": 0.0 if optimal else None}
+    return (solution["values"] if has_solution else None), solve_info, manifest, index
+
+
+def solution_assignment(values, manifest, index):
+    # (staff, day, shift type) 0/1 array from the column values of a bundle solution
+    shape = (len(manifest["staff_info"]), manifest["num_weeks"] * manifest["days_per_week"], len(manifest["shift_hours"]))
+    shift_values = np.array([values.get(mps_name, 0.0) for mps_name in index["shift_columns"]])
+    return (shift_values.reshape(shape) > 0.5).astype(np.int8)
+
+
+def load_report(directory, solution_path=None):
+    """
+    Reports on a bundle solution straight from the manifest, without any PuLP model.
+
+    Returns:
+    SolutionReport: Supports generate_report() and the individual reports.
+    """
+    from reporting import SolutionReport
+
+    values, solve_info, manifest, index = read_solution(directory, solution_path)
+    if values is None:
+        raise ValueError(f"The bundle solution has no schedule (status {solve_info['status']})")
+    analytics = ScheduleAnalytics(solution_assignment(values, manifest, index), manifest["staff_info"],
+                                  manifest["shift_hours"], manifest["days_per_week"], manifest["max_hours_full_time"])
+    return SolutionReport(analytics, solve_info)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
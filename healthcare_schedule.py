@@ -1,23 +1,103 @@
+import threading
+import time
+
 import pulp
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import datetime
-import warnings
-import matplotlib.dates as mdates
+import numpy as np
+
+from analytics import ScheduleAnalytics
+from availability import FREE, availability_from_table, day_label, load_availability
+from reporting import ScheduleReporting
+
 
+# Parameters of the default model of add_constraints() and set_objective(), also written by streaming.write_model()
+MAX_HOURS_FULL_TIME = 1622  # Maximum hours for full time staff per year
+MAX_HOURS_NIGHT_SHIFT = 2000  # Increased maximum hours for night shift workers
+DAY_SHIFT_TOLERANCE = 0.16  # Allowed variance of the yearly hours (0.04 means 4 %)
+NIGHT_SHIFT_TOLERANCE = 0.25  # Increased tolerance for night shift workers
+ISOLATED_DAY_WEIGHT = 100
+SHIFT_DISTRIBUTION_WEIGHT = 0.0000001
+MAX_D1_DAYS_IN_7 = 4
 
-class HealthcareSchedule:
-    def __init__(self, num_weeks, days_per_week, staff_info, shift_hours):
+
+# Model building and solving only; reports live in ScheduleReporting so solver
+# workers never import pandas/matplotlib/seaborn
+class HealthcareSchedule(ScheduleReporting):
+    def __init__(self, num_weeks, days_per_week, staff_info, shift_hours, availability=None, year_weeks=None):
         self.num_weeks = num_weeks
+        # With year_weeks the model is one cycle of a rotation repeated over year_weeks weeks, see tile_year()
+        self.year_weeks = year_weeks or num_weeks
+        self.cyclic = year_weeks is not None
         self.days_per_week = days_per_week
         self.staff_info = staff_info
         self.shift_hours = shift_hours
         self.problem = pulp.LpProblem("Healthcare_Scheduling", pulp.LpMaximize)
         self.shifts = None
-        self.objective_function_components = []  # Initialize the list to store objective function components
-        self.MAX_HOURS_FULL_TIME = 1622  # Maximum hours for full time staff per year
+        self._analytics = None
+        self._publish_lock = threading.Lock()  # Schedule, analytics and solve info change together
+        self.assignment = None  # Solved shifts as a (staff, day, shift type) 0/1 array
+        self.highs_model = None  # Live HiGHS handle when solved with backend="highs"
+        self._shift_columns = None
+        self.window_prefix_sums = False  # Build window constraints on shared prefix sums (O(days) nonzeros)
+        self.prefix_sum_vars = {}
+        self.lazy_windows = False  # Record window rows instead of adding them, see solve_lazy()
+        self.lazy_window_specs = []
+        self._lazy_windows_added = {}
+        self.lazy_stats = None
+        self.solution_pool_results = None
+        self.lexicographic_results = None
+        self.anytime = False  # Report on feasible incumbents too, not only proven optimal schedules
+        self.solve_info = None  # Status, objective, best bound and gap of the published schedule
+        self.background_improver = None  # Thread started by improve_in_background()
+        self._stop_improving = None
+        self.objective_components = {}  # Objective terms per named family, without their weight
+        self.objective_weights = {}  # Weight per family, see reweight()
+        self.MAX_HOURS_FULL_TIME = MAX_HOURS_FULL_TIME
+        self.availability = None  # (staff, day) matrix of FREE, OFF or pinned shift type index
+        self.role_restricted = False  # Shifts of another type than the staff member's own are bounded to 0
+        self.hour_bounds = {}  # (min, max) hours over the modelled weeks per staff member, set by add_constraints()
+        self.max_days_caps = {}  # (window, max days) per capped staff member, set by add_constraints()
+        self.shift_diff_vars = {}
+        self.shift_count_bounds = None  # (min, max) shifts per staff member, set by add_valid_inequalities()
         self.initialize_variables()
+        if availability is not None:
+            self.apply_availability(availability)
+
+    @property
+    def assignment(self):
+        return self._assignment
+
+    @assignment.setter
+    def assignment(self, assignment):
+        # A new solution invalidates the cached analytics
+        with self._publish_lock:
+            self._assignment = assignment
+            self._analytics = None
+
+    @property
+    def analytics(self):
+        # Metrics of the current solution, computed once and shared by all reports
+        return self._report_snapshot()[0]
+
+    def _report_snapshot(self):
+        # Analytics and solve info of one and the same schedule, even while the background improver publishes
+        with self._publish_lock:
+            assignment, analytics, solve_info = self._assignment, self._analytics, self.solve_info
+        if analytics is None and assignment is not None:
+            analytics = self._build_analytics(assignment)
+            with self._publish_lock:
+                # Only cached if no other schedule was published meanwhile
+                if self._assignment is assignment and self._analytics is None:
+                    self._analytics = analytics
+        return analytics, solve_info
+
+    def _build_analytics(self, assignment):
+        return ScheduleAnalytics(assignment, self.staff_info, self.shift_hours, self.days_per_week,
+                                 self.MAX_HOURS_FULL_TIME * self.hours_scale)
+
+    @property
+    def hours_scale(self):
+        # Share of the yearly hour targets this model covers, 1 unless it is a rotation cycle
+        return self.num_weeks / self.year_weeks
 
     def initialize_variables(self):
         # Create LP variables
@@ -31,14 +111,102 @@ class HealthcareSchedule:
             for shift_type in self.shift_hours
         }
 
-    def add_constraints(self):
+    def apply_availability(self, availability):
+        """
+        Applies days off and pinned shifts as variable bounds, not as constraint rows.
+
+        Unavailable days get an upper bound of 0 on every shift of that day,
+        pinned shifts a lower bound of 1 (and 0 on the other shifts of the
+        day). Fixed cells cost no rows and the solver's presolve removes their
+        columns, so many of them make the model smaller. Applied on top of
+        earlier calls (a cell set again replaces its earlier value), and to
+        the live HiGHS model too when there is one.
+
+        Parameters:
+        availability (str, dict or ndarray): A CSV or Excel file (see availability.load_availability),
+        the same table inline as {staff: {date or day index: value}}, or a
+        (staff, day) array of FREE, OFF and pinned shift type indices.
+        """
+        num_days = self.num_weeks * self.days_per_week
+        if isinstance(availability, str):
+            availability = load_availability(availability, self.staff_info, self.shift_hours, num_days)
+        elif isinstance(availability, dict):
+            availability = availability_from_table(availability, self.staff_info, self.shift_hours, num_days)
+        availability = np.asarray(availability, dtype=np.int16)
+        if availability.shape != (len(self.staff_info), num_days):
+            raise ValueError(f"Availability must have shape {(len(self.staff_info), num_days)}, got {availability.shape}")
+
+        if self.availability is None:
+            self.availability = availability.copy()
+        else:
+            self.availability = np.where(availability != FREE, availability, self.availability)
+
+        staff = list(self.staff_info)
+        changed = []
+        for staff_index, day_index in zip(*np.nonzero(availability != FREE)):
+            week, day = divmod(int(day_index), self.days_per_week)
+            role = self.staff_info[staff[staff_index]]["shift"]
+            for shift_index, shift_type in enumerate(self.shift_hours):
+                var = self.shifts[staff[staff_index], week, day, shift_type]
+                # A new value replaces an earlier pin or day off of the cell, the role restriction stays
+                pinned = availability[staff_index, day_index] == shift_index
+                var.lowBound = 1 if pinned else 0
+                var.upBound = 1 if pinned and not (self.role_restricted and shift_type != role) else 0
+                changed.append(var)
+
+        if self.highs_model is not None and changed:
+            self.highs_model.change_bounds(changed, [var.lowBound for var in changed], [var.upBound for var in changed])
+
+    def availability_conflicts(self):
+        """
+        Checks pinned and unavailable days against the shift coverage before solving.
+
+        Flags pins to a shift type the staff member doesn't work, more than one
+        person pinned to the same shift on a day (each shift needs exactly
+        one), and shifts nobody can cover because everyone who works them is
+        off or pinned elsewhere.
+
+        Returns:
+        list: One message per conflict, empty when there are none.
+        """
+        if self.availability is None:
+            return []
+
+        staff = list(self.staff_info)
+        shift_types = list(self.shift_hours)
+        roles = np.array([info["shift"] for info in self.staff_info.values()])
+        conflicts = []
+
+        for staff_index, day_index in zip(*np.nonzero(self.availability >= 0)):
+            shift_type = shift_types[self.availability[staff_index, day_index]]
+            if shift_type != roles[staff_index]:
+                conflicts.append(f"{staff[staff_index].strip()} is pinned to {shift_type} on {day_label(day_index)} "
+                                 f"but only works {roles[staff_index]}")
+
+        for shift_index, shift_type in enumerate(shift_types):
+            pinned = (self.availability == shift_index).sum(axis=0)
+            for day_index in np.nonzero(pinned > 1)[0]:
+                conflicts.append(f"{pinned[day_index]} staff are pinned to {shift_type} on {day_label(day_index)}, "
+                                 f"it needs exactly one")
+
+            can_cover = (roles == shift_type)[:, None] & np.isin(self.availability, (FREE, shift_index))
+            for day_index in np.nonzero(~can_cover.any(axis=0))[0]:
+                conflicts.append(f"Nobody can cover {shift_type} on {day_label(day_index)}, "
+                                 f"everyone who works it is off or pinned elsewhere")
+        return conflicts
+
+    def add_constraints(self, lazy_windows=False):
         # Add various constraints 
 
+        # With lazy_windows the window rows are only added by solve_lazy() once they are violated,
+        # either for every window rule (True) or only for the rule names listed
+        self.lazy_windows = lazy_windows
+
         # Constraints for day and nightworkers in percentage (0.04 menas % variance)
-        self._add_work_hours_constraints(0.16, 0.25)
+        self._add_work_hours_constraints(DAY_SHIFT_TOLERANCE, NIGHT_SHIFT_TOLERANCE)
         
         # Constraints for isolated work days and off days, penatly as input
-        self._add_isolated_day_constraints(100)
+        self._add_isolated_day_constraints(ISOLATED_DAY_WEIGHT)
 
         # Constraints for (i.e not to many)
         self._add_weekend_work_constraints()
@@ -47,75 +215,145 @@ class HealthcareSchedule:
         self._add_shift_type_constraints()
 
         # I.e max 4 days in a 7 day period a D1 can work
-        self._add_max_days_worked_constraints(4)
+        self._add_max_days_worked_constraints(MAX_D1_DAYS_IN_7)
 
         #   self._add_max_consecutive_days_worked_constraints()
         self._add_role_specific_shift_constraints()
 
         # Constraints for shift distribution and consecutive days, penatly as input
-        self._add_shift_distribution_objective(0.0000001)
+        self._add_shift_distribution_objective(SHIFT_DISTRIBUTION_WEIGHT)
 
         # Constraints for consecutive days, penatly as input
         # self._add_pref_consecutive_days_constraints(0.0000000001)
         
         #  self._add_weekend_fairness_constraint()
-        self._compile_objective_function()
+        # The objective is set once, by set_objective() (or per stage by solve_lexicographic())
     
+    def add_valid_inequalities(self):
+        """
+        Adds inequalities implied by the model that the solver doesn't derive by itself.
+
+        Every day needs exactly one shift of each type and staff only work
+        their own type, so each pool does exactly one shift per day of its
+        type in total. Each person's hour bounds, divided by the shift length
+        and rounded inwards, give a whole number of shifts. A cap of k days
+        in every window of w days gives at most floor(k * days / w). The
+        pool totals then tighten these counts further, and the counts are
+        added as one min and one max row per person. Since the total shift
+        count is fixed, so is the average the shift_diff variables measure
+        against; whole counts that add up to that total give a lower bound
+        on every shift_diff and on their sum. Call after add_constraints().
+        Raises a ValueError when a pool can't do its shifts within its hours.
+
+        Returns:
+        list: Names of the added rows.
+        """
+        num_days = self.num_weeks * self.days_per_week
+        counts, bounds = {}, {}
+        for staff_member, info in self.staff_info.items():
+            shift_type = info["shift"]
+            counts[staff_member] = pulp.lpSum(self.shifts[staff_member, week, day, shift_type]
+                                              for week in range(self.num_weeks)
+                                              for day in range(self.days_per_week))
+            min_hours, max_hours = self.hour_bounds[staff_member]
+            low = int(np.ceil(min_hours / self.shift_hours[shift_type] - 1e-9))
+            high = int(np.floor(max_hours / self.shift_hours[shift_type] + 1e-9))
+            if staff_member in self.max_days_caps:
+                window, max_days = self.max_days_caps[staff_member]
+                high = min(high, max_days * num_days // window)
+            bounds[staff_member] = [low, min(high, num_days)]
+
+        pools = {shift_type: [staff_member for staff_member, info in self.staff_info.items()
+                              if info["shift"] == shift_type]
+                 for shift_type in self.shift_hours}
+
+        # What the rest of the pool can at most (least) do bounds each person from below (above)
+        changed = True
+        while changed:
+            changed = False
+            for shift_type, pool in pools.items():
+                total_low = sum(bounds[staff_member][0] for staff_member in pool)
+                total_high = sum(bounds[staff_member][1] for staff_member in pool)
+                # Also keeps every tightened low at or below its high, so the loop ends
+                inverted = any(bounds[staff_member][0] > bounds[staff_member][1] for staff_member in pool)
+                if inverted or not total_low <= num_days <= total_high:
+                    raise ValueError(f"Pool {shift_type} cannot cover its shifts: {', '.join(name.strip() for name in pool) or 'nobody'} can do "
+                                     f"{total_low} to {total_high} of its {num_days} shifts within their hours")
+                for staff_member in pool:
+                    low, high = bounds[staff_member]
+                    tightened = [max(low, num_days - (total_high - high)), min(high, num_days - (total_low - low))]
+                    if tightened != [low, high]:
+                        bounds[staff_member] = tightened
+                        changed = True
+        self.shift_count_bounds = {staff_member: tuple(bound) for staff_member, bound in bounds.items()}
+
+        # The pool totals themselves are the sum of the coverage rows; as extra rows they only slow CBC down
+        rows = []
+        for staff_member, (low, high) in self.shift_count_bounds.items():
+            rows.append(pulp.LpConstraint(counts[staff_member], pulp.LpConstraintGE, f"Cut_Min_Shifts_{staff_member}", low))
+            rows.append(pulp.LpConstraint(counts[staff_member], pulp.LpConstraintLE, f"Cut_Max_Shifts_{staff_member}", high))
+
+        # The average is a constant, one shift of every type per day spread over all staff. Whole shift
+        # counts can't all hit a fractional average, which bounds the imbalance from below.
+        if self.shift_diff_vars:
+            total = num_days * len(self.shift_hours)
+            average = total / len(self.staff_info)
+            for staff_member, (low, high) in self.shift_count_bounds.items():
+                self.shift_diff_vars[staff_member].lowBound = abs(min(max(round(average), low), high) - average)
+            min_imbalance = self._min_total_deviation(self.shift_count_bounds, total, average)
+            if min_imbalance is not None:
+                rows.append(pulp.LpConstraint(pulp.lpSum(self.shift_diff_vars.values()), pulp.LpConstraintGE,
+                                              "Cut_Shift_Imbalance", min_imbalance - 1e-9))
+            if self.highs_model is not None:
+                diffs = list(self.shift_diff_vars.values())
+                self.highs_model.change_bounds(diffs, [var.lowBound for var in diffs], [var.upBound for var in diffs])
+
+        self._add_rows(rows)
+        return [row.name for row in rows]
+
+    @staticmethod
+    def _min_total_deviation(bounds, total, average):
+        # Smallest sum of |count - average| over whole counts within bounds adding up to total, None if there
+        # are none. Every term is convex, so moving one shift at a time at the lowest extra cost is optimal.
+        counts = {staff_member: min(max(round(average), low), high) for staff_member, (low, high) in bounds.items()}
+        step = 1 if sum(counts.values()) < total else -1
+        while sum(counts.values()) != total:
+            movable = [staff_member for staff_member, (low, high) in bounds.items()
+                       if low <= counts[staff_member] + step <= high]
+            if not movable:
+                return None
+            cheapest = min(movable, key=lambda staff_member: abs(counts[staff_member] + step - average)
+                                                             - abs(counts[staff_member] - average))
+            counts[cheapest] += step
+        return sum(abs(count - average) for count in counts.values())
+
     # Prefer to assign staff members to their preffered shift lengt    
     def _add_pref_consecutive_days_constraints(self, penalty_weight):
         for staff_member, info in self.staff_info.items():
             pref_consecutive_days = info["pref_consecutive_days"]
 
-            for week in range(self.num_weeks):
-                for start_day in range(self.days_per_week):
-                    # Calculate the end day for the consecutive work period
-                    end_day = min(start_day + pref_consecutive_days, self.days_per_week)
-
-                    # Count the number of working days in this period
-                    working_days = pulp.lpSum(self.shifts[staff_member, week, day, shift_type]
-                                            for day in range(start_day, end_day)
-                                            for shift_type in self.shift_hours)
+            # Count the number of working days in every pref_consecutive_days window
+            daily = self._daily_shift_sums(staff_member, self.shift_hours)
+            window_sums = self._window_sums(staff_member, self.shift_hours, daily, pref_consecutive_days,
+                                            wrap=self.cyclic)
 
-                    # Variables for positive and negative deviation
-                    pos_deviation = pulp.LpVariable(f"pos_dev_{staff_member}_{week}_{start_day}", lowBound=0)
-                    neg_deviation = pulp.LpVariable(f"neg_dev_{staff_member}_{week}_{start_day}", lowBound=0)
+            for start_day, working_days in enumerate(window_sums):
+                # Variables for positive and negative deviation
+                pos_deviation = pulp.LpVariable(f"pos_dev_{staff_member}_{start_day}", lowBound=0)
+                neg_deviation = pulp.LpVariable(f"neg_dev_{staff_member}_{start_day}", lowBound=0)
 
-                    # Add constraints to link the deviation variables with the working days
-                    self.problem += (pos_deviation >= working_days - pref_consecutive_days)
-                    self.problem += (neg_deviation >= pref_consecutive_days - working_days)
+                # Add constraints to link the deviation variables with the working days
+                self.problem += (pos_deviation >= working_days - pref_consecutive_days)
+                self.problem += (neg_deviation >= pref_consecutive_days - working_days)
 
-                    # Add the penalties to the objective function
-                    self.objective_function_components.append(penalty_weight * (pos_deviation + neg_deviation))
+                # Add the penalties to the objective function
+                self._add_objective_term("pref_consecutive_days", penalty_weight, -(pos_deviation + neg_deviation))
 
-
-    def _add_max_consecutive_days_worked_constraints(self):
-        max_consecutive_days = 7  # Maximum number of consecutive days a staff member can work
+    def _add_max_consecutive_days_worked_constraints(self, max_consecutive_days=7):
+        # Working max_consecutive_days + 1 days in a row is the same as a full window of that length
         for staff_member in self.staff_info:
-            for week in range(self.num_weeks):
-                for start_day in range(self.days_per_week):
-                    # Calculate the end day and adjust for week transition
-                    end_day = start_day + max_consecutive_days
-                    if end_day > self.days_per_week:
-                        # Window spans two weeks
-                        days_in_current_week = self.days_per_week - start_day
-                        days_in_next_week = end_day - self.days_per_week
-                        next_week = (week + 1) % self.num_weeks
-
-                        # Sum shifts across the 7-day window spanning two weeks
-                        shift_sum = pulp.lpSum(self.shifts[staff_member, week, day, shift_type] 
-                                               for day in range(start_day, self.days_per_week)
-                                               for shift_type in self.shift_hours) + \
-                                    pulp.lpSum(self.shifts[staff_member, next_week, day, shift_type] 
-                                               for day in range(days_in_next_week)
-                                               for shift_type in self.shift_hours)
-                    else:
-                        # Window within a single week
-                        shift_sum = pulp.lpSum(self.shifts[staff_member, week, day, shift_type] 
-                                               for day in range(start_day, end_day)
-                                               for shift_type in self.shift_hours)
-
-                    # Apply the constraint
-                    self.problem += (shift_sum <= max_consecutive_days, f"Max_Consecutive_Days_{staff_member}_Week{week}_StartDay{start_day}")
+            self._add_max_window_constraints("Max_Consecutive_Days", staff_member, self.shift_hours,
+                                             max_consecutive_days + 1, max_consecutive_days)
 
     # Tries to evenly distribute shifts
     def _add_shift_distribution_objective(self, penalty_weight):
@@ -135,6 +373,7 @@ class HealthcareSchedule:
         # Auxiliary variables for differences
         shift_diff_vars = {staff_member: pulp.LpVariable(f"shift_diff_{staff_member}", lowBound=0)
                         for staff_member in total_shift_count}
+        self.shift_diff_vars = shift_diff_vars
 
         # Add objectives to minimize the absolute differences from the average
         for staff_member in total_shift_count:
@@ -143,47 +382,90 @@ class HealthcareSchedule:
             self.problem += shift_diff_vars[staff_member] >= avg_shift_count - total_shift_count[staff_member]
 
             # Add the absolute difference with a penalty weight to the objective function components
-            self.objective_function_components.append(penalty_weight * shift_diff_vars[staff_member])
+            # (negated like the other penalties, the objective is maximised)
+            self._add_objective_term("shift_distribution", penalty_weight, -shift_diff_vars[staff_member])
 
     # This constraint will try to set the maximum number of days worked in a 7-day period
-    def _add_max_days_worked_constraints(self, max_days_in_7):
-
+    def _add_max_days_worked_constraints(self, max_days_in_7, window=7):
         for staff_member, info in self.staff_info.items():
             if info["shift"] == "D1":
-                for week in range(self.num_weeks):
-                    for start_day in range(self.days_per_week):
-                        # Calculate the end day and adjust for week transition
-                        end_day = start_day + 7
-                        if end_day > self.days_per_week:
-                            # Window spans two weeks
-                            days_in_current_week = self.days_per_week - start_day
-                            days_in_next_week = end_day - self.days_per_week
-                            next_week = (week + 1) % self.num_weeks
-
-                            # Sum shifts across the 7-day window spanning two weeks
-                            shift_sum = pulp.lpSum(self.shifts[staff_member, week, day, "D1"] 
-                                                   for day in range(start_day, self.days_per_week)) + \
-                                        pulp.lpSum(self.shifts[staff_member, next_week, day, "D1"] 
-                                                   for day in range(days_in_next_week))
-                        else:
-                            # Window within a single week
-                            shift_sum = pulp.lpSum(self.shifts[staff_member, week, day, "D1"] 
-                                                   for day in range(start_day, end_day))
-
-                        # Apply the constraint
-                        self.problem += (shift_sum <= max_days_in_7, f"Max_{max_days_in_7}_D1_Shifts_{staff_member}_Week{week}_StartDay{start_day}")
+                self.max_days_caps[staff_member] = (window, max_days_in_7)
+                self._add_max_window_constraints(f"Max_{max_days_in_7}_D1_Shifts", staff_member, ["D1"],
+                                                 window, max_days_in_7)
+
+    # Caps the shifts of the given types a staff member works in every window of consecutive days
+    def _add_max_window_constraints(self, name, staff_member, shift_types, window, max_shifts):
+        if self.lazy_windows is True or (self.lazy_windows and name in self.lazy_windows):
+            self.lazy_window_specs.append((name, staff_member, list(shift_types), window, max_shifts))
+            return
+
+        daily = self._daily_shift_sums(staff_member, shift_types)
+        window_sums = self._window_sums(staff_member, shift_types, daily, window)
+        for start_day, shift_sum in enumerate(window_sums):
+            self.problem += (shift_sum <= max_shifts, f"{name}_{window}d_{staff_member}_Day{start_day}")
+
+    def _daily_shift_sums(self, staff_member, shift_types):
+        # Shifts of the given types worked on each day, over a flat day index (week * days_per_week + day)
+        return [pulp.lpSum(self.shifts[staff_member, week, day, shift_type] for shift_type in shift_types)
+                for week in range(self.num_weeks)
+                for day in range(self.days_per_week)]
+
+    def _window_sums(self, staff_member, shift_types, daily, window, wrap=True):
+        """
+        Builds the sum of daily over every window of consecutive days.
+
+        With wrap=True windows running past the last day continue from day 0,
+        matching the old (week + 1) % num_weeks behaviour. When prefix sums are
+        enabled every window sum is two or three prefix variables instead of
+        window terms, so the nonzeros grow with the number of days only and the
+        prefix variables are shared between all windows over the same shifts.
+
+        Returns:
+        list: One expression per window, indexed by the flat start day.
+        """
+        num_days = len(daily)
+        if window > num_days:
+            raise ValueError(f"A {window} day window does not fit in a {num_days} day schedule")
+        starts = range(num_days) if wrap else range(num_days - window + 1)
+
+        if not self.window_prefix_sums:
+            return [pulp.lpSum(daily[(start + offset) % num_days] for offset in range(window)) for start in starts]
+
+        prefix = self._prefix_sums(staff_member, shift_types, daily)
+        window_sums = []
+        for start in starts:
+            end = start + window
+            if end <= num_days:
+                window_sums.append(prefix[end] - prefix[start])
+            else:
+                window_sums.append(prefix[num_days] - prefix[start] + prefix[end - num_days])
+        return window_sums
+
+    def _prefix_sums(self, staff_member, shift_types, daily):
+        # prefix[t] is the number of shifts worked on days 0 .. t - 1
+        key = (staff_member, tuple(shift_types))
+        if key not in self.prefix_sum_vars:
+            name = "_".join(shift_types)
+            prefix = [0]
+            for day_index, shifts_on_day in enumerate(daily, start=1):
+                prefix_var = pulp.LpVariable(f"prefix_{staff_member}_{name}_{day_index}", lowBound=0)
+                self.problem += (prefix_var == prefix[-1] + shifts_on_day)
+                prefix.append(prefix_var)
+            self.prefix_sum_vars[key] = prefix
+        return self.prefix_sum_vars[key]
 
     # Prefer to assign staff members to their preferred shift type
     def _add_role_specific_shift_constraints(self):
+            self.role_restricted = True
             for staff_member, info in self.staff_info.items():
                 assigned_shift = info["shift"]
 
                 for week in range(self.num_weeks):
                     for day in range(self.days_per_week):
                         for shift_type in self.shift_hours:
-                            # Staff member can only work their assigned shift type
+                            # Staff member can only work their assigned shift type (a bound, not a row)
                             if shift_type != assigned_shift:
-                                self.problem += (self.shifts[staff_member, week, day, shift_type] == 0)
+                                self.shifts[staff_member, week, day, shift_type].upBound = 0
 
     # Ensures that each shift type is assigned exactly once per day
     def _add_shift_type_constraints(self):
@@ -203,20 +485,15 @@ class HealthcareSchedule:
 
     # Ensures that each staff member works within their allowed hours
     def _add_work_hours_constraints(self, day_shift_tolerance, night_shift_tolerance):
-        # Constants
-        MAX_HOURS_FULL_TIME = 1622
-        TOLERANCE = day_shift_tolerance
-        MAX_HOURS_NIGHT_SHIFT = 2000  # Increased maximum hours for night shift workers
-        NIGHT_SHIFT_TOLERANCE = night_shift_tolerance  # Increased tolerance for night shift workers
-
         # Lower and upper bounds for full-time and night shift full-time
-        lower_bound_full_time = MAX_HOURS_FULL_TIME * (1 - TOLERANCE)
-        upper_bound_full_time = MAX_HOURS_FULL_TIME * (1 + TOLERANCE)
-        lower_bound_night_shift = MAX_HOURS_NIGHT_SHIFT * (1 - NIGHT_SHIFT_TOLERANCE)
-        upper_bound_night_shift = MAX_HOURS_NIGHT_SHIFT * (1 + NIGHT_SHIFT_TOLERANCE)
+        lower_bound_full_time = MAX_HOURS_FULL_TIME * (1 - day_shift_tolerance)
+        upper_bound_full_time = MAX_HOURS_FULL_TIME * (1 + day_shift_tolerance)
+        lower_bound_night_shift = MAX_HOURS_NIGHT_SHIFT * (1 - night_shift_tolerance)
+        upper_bound_night_shift = MAX_HOURS_NIGHT_SHIFT * (1 + night_shift_tolerance)
 
         for staff_member, info in self.staff_info.items():
-            work_percentage = info["work_percentage"] / 100
+            # A rotation cycle gets its share of the yearly hours
+            work_percentage = info["work_percentage"] / 100 * self.hours_scale
 
             # Determine max and min hours based on shift type
             if info["shift"] == "Night":
@@ -233,6 +510,7 @@ class HealthcareSchedule:
                                      for shift_type in self.shift_hours if shift_type in info["shift"])
 
             # Apply constraints for maximum and minimum hours
+            self.hour_bounds[staff_member] = (min_hours, max_hours)
             self.problem += (staff_hours <= max_hours)
             self.problem += (staff_hours >= min_hours)
 
@@ -240,14 +518,14 @@ class HealthcareSchedule:
             if info["shift"] != "Night":
                 for week in range(self.num_weeks):
                     for day in range(self.days_per_week):
-                        self.problem += (self.shifts[staff_member, week, day, "Night"] == 0)
+                        self.shifts[staff_member, week, day, "Night"].upBound = 0
 
             # Enforce that night workers cannot be assigned to day shifts
             else:
                 for week in range(self.num_weeks):
                     for day in range(self.days_per_week):
                         for day_shift in ["D1", "D2", "Mx"]:
-                            self.problem += (self.shifts[staff_member, week, day, day_shift] == 0)
+                            self.shifts[staff_member, week, day, day_shift].upBound = 0
 
     # Tries to reduce isolated work days and off days
     def _add_isolated_day_constraints(self, isolated_day_penalty_weight):
@@ -283,7 +561,7 @@ class HealthcareSchedule:
             self.problem += isolated_off_var >= (1 - self.shifts[staff_member, week, day, self.staff_info[staff_member]["shift"]]) - ((1 - self.shifts[staff_member, week, day - 1, self.staff_info[staff_member]["shift"]]) + (1 - self.shifts[staff_member, week, day + 1, self.staff_info[staff_member]["shift"]]))
 
         # Add penalty for isolated days to the objective function
-        self.objective_function_components.append(-penalty_weight * (isolated_work_var + isolated_off_var))
+        self._add_objective_term("isolated_days", penalty_weight, -(isolated_work_var + isolated_off_var))
 
     def _add_weekend_work_constraints(self):
         # Initialize dictionary for weekend work variables
@@ -332,9 +610,7 @@ class HealthcareSchedule:
         unfairness_threshold = 2  # Threshold for considering the unfairness significant
 
         # Add incremental penalty to the objective function
-        self.objective_function_components.append(
-            small_unfairness_penalty * fairness_metric
-        )
+        self._add_objective_term("fairness", small_unfairness_penalty, -fairness_metric)
 
         self.problem += large_unfairness_penalty * (fairness_metric - unfairness_threshold) >= 0
 
@@ -342,331 +618,550 @@ class HealthcareSchedule:
     def set_objective(self):
 
         # Set the objective function
-        self.problem += pulp.lpSum(self.objective_function_components), "Total Objective Function"
-
-    def solve(self):
-        # Solve the LP problem and handle the solution
-        # Use PuLP's solver to solve the problem
-        solver = pulp.PULP_CBC_CMD(msg=1)  # Removed maxSeconds argument
-        self.problem.solve(solver)
-
-        # Check if an optimal solution was found
-        if self.problem.status == pulp.LpStatusOptimal:
-            print("An optimal solution was found.")
-        else:
-            print("No optimal solution found. Please check the problem constraints.")
-
-    def generate_report(self):
-        # Check the status of the solution and print the schedule
-        if self.problem.status == pulp.LpStatusOptimal:
-            print("An optimal solution was found.\n")
-            # Generate textual report as shown in your example
-            #   self.debugVariables()
-            self.generate_textreport()
-            self.print_schedule()
-            self.suggest_improvements()
-            self.plot_schedule()
-            self.export_schedule_to_excel("Staff_Shift_Schedule_2024.xlsx")
+        self._use_objective(self._objective_expression())
+
+    def _use_objective(self, expression, name="Total Objective Function"):
+        # Replace the objective on the PuLP problem and, when solved with HiGHS, on the live model
+        self.problem.setObjective(expression)
+        self.problem.objective.name = name
+        if self.highs_model is not None:
+            self.highs_model.set_objective(self.problem.objective)
+
+    def _add_objective_term(self, family, weight, term):
+        # Terms are stored unweighted per family so the weights can be changed after the model is built.
+        # Penalties are added negated: the objective is maximised
+        self.objective_components.setdefault(family, []).append(term)
+        self.objective_weights[family] = weight
+
+    def _objective_expression(self, weights=None):
+        weights = self.objective_weights if weights is None else weights
+        return pulp.lpSum(weights[family] * pulp.lpSum(terms) for family, terms in self.objective_components.items())
+
+    def objective_values(self):
+        # Unweighted value of every objective family in the current solution
+        return {family: pulp.value(pulp.lpSum(terms)) for family, terms in self.objective_components.items()}
+
+    def reweight(self, time_limit=None, msg=0, **weights):
+        """
+        Changes objective family weights on the built model and re-solves.
 
-        else:
-            print("No optimal solution found. Will not generate a report.")
+        Only the objective is replaced, no variables or constraints are rebuilt,
+        and the solve starts from the previous solution. Families are
+        isolated_days, shift_distribution, fairness and pref_consecutive_days
+        (those that add_constraints actually added).
 
-    def suggest_improvements(self):
+        Example:
+        schedule.reweight(isolated_days=50, shift_distribution=0.001)
         """
-        Analyzes the current scheduling solution and suggests improvements.
+        unknown = set(weights) - set(self.objective_components)
+        if unknown:
+            raise ValueError(f"Unknown objective families: {', '.join(sorted(unknown))}")
+        self.objective_weights.update(weights)
+        self._use_objective(self._objective_expression())
+        self.resolve(time_limit, msg)
+
+    def solve_lexicographic(self, priorities=None, tolerances=None, backend="highs", time_limit=None, msg=0,
+                            anytime=False):
         """
-        print("Suggested Improvements:")
-        
-        # Calculate total expected hours for all staff
-        total_expected_hours = sum((info['work_percentage'] / 100) * self.MAX_HOURS_FULL_TIME for info in self.staff_info.values())
+        Optimises the objective families one after the other instead of as one weighted sum.
 
-        # Calculate total actual hours worked by all staff
-        total_actual_hours = sum(
-            sum(pulp.value(self.shifts[staff_member, week, day, shift_type]) * self.shift_hours[shift_type]
-                for week in range(self.num_weeks)
-                for day in range(self.days_per_week)
-                for shift_type in self.shift_hours)
-            for staff_member in self.staff_info
-        )
+        Each stage maximises a single family with unit weight. Its optimum is
+        then kept by a "Lex_<family>" row (family >= optimum - tolerance) while
+        the next stage, warm-started from the previous schedule (HiGHS only),
+        optimises the next family. This avoids mixing 100 and 1e-7 weights in one objective.
+        At the end the stage rows are removed again and the weighted objective
+        restored, so reweight() and solution_pool() keep working on the
+        original model; the lexicographic schedule stays loaded.
 
-        # Calculate the shortfall or excess in hours
-        hours_difference = total_actual_hours - total_expected_hours
-
-        # If there's a significant shortfall, suggest hiring more staff
-        if hours_difference < -100:  # Arbitrary threshold for significant shortfall
-            print("- Consider hiring additional staff to cover the shortfall of", -hours_difference, "hours.")
-
-        # If there's a significant excess, suggest reducing work percentages or reassigning tasks
-        elif hours_difference > 100:  # Arbitrary threshold for significant excess
-            print("- Consider reducing work percentages or reassigning tasks to manage the excess of", hours_difference, "hours.")
+        Parameters:
+        priorities (list): Families in priority order, defaults to those in the
+        model ordered by their weight (largest first), as the weighted sum implies.
+        tolerances (dict): Allowed loss per family in its own units (e.g. 1 isolated day), default 0.
+        time_limit (float): Time limit per stage in seconds.
 
-        # Check for staff members who are significantly overworked or underworked
-        for staff_member, info in self.staff_info.items():
-            total_hours_staff_member = sum(
-                pulp.value(self.shifts[staff_member, week, day, shift_type]) * self.shift_hours[shift_type]
-                for week in range(self.num_weeks)
-                for day in range(self.days_per_week)
-                for shift_type in self.shift_hours
-            )
-            expected_hours = (info['work_percentage'] / 100) * self.MAX_HOURS_FULL_TIME
-            discrepancy = total_hours_staff_member - expected_hours
-
-            # Suggest adjustments for individual staff members
-            if discrepancy > 50:  # Threshold for considering someone as overworked
-                print(f"- {staff_member} is overworked by {discrepancy} hours. Consider reducing workload.")
-            elif discrepancy < -50:  # Threshold for considering someone as underworked
-                print(f"- {staff_member} is underworked by {-discrepancy} hours. Consider increasing workload or reassigning tasks.")
-
-    def print_schedule(self):
-            # Check the status of the solution and print the schedule
-            if self.problem.status == pulp.LpStatusOptimal:
-                for week in range(self.num_weeks):
-                    print(f"Week {week + 1}:")
-                    for day in range(self.days_per_week):
-                        day_schedule = []
-                        for shift_type in self.shift_hours:
-                            # List of staff members working this shift on this day
-                            working_staff = [staff_member for staff_member in self.staff_info if pulp.value(self.shifts[staff_member, week, day, shift_type]) == 1]
-                            
-                            # Check for non-night workers assigned to night shifts
-                            if shift_type == "Night":
-                                non_night_workers = [staff_member for staff_member in working_staff if self.staff_info[staff_member]["shift"] != "Night"]
-                                if non_night_workers:
-                                    print(f"  Error: Non-night workers assigned to night shift: {', '.join(non_night_workers)}")
-
-                            if working_staff:
-                                day_schedule.append(f"{', '.join(working_staff)} {shift_type}")
-                        print(f"  Day {day + 1}: {' | '.join(day_schedule)}")
-                    print()  # Adds an empty line for better readability between weeks
+        Returns:
+        list: Per stage the family, its optimum, solver status and wall time,
+        also kept in self.lexicographic_results.
+        """
+        if priorities is None:
+            priorities = sorted(self.objective_components, key=lambda family: -abs(self.objective_weights[family]))
+        unknown = set(priorities) - set(self.objective_components)
+        if unknown:
+            raise ValueError(f"Unknown objective families: {', '.join(sorted(unknown))}")
+        tolerances = tolerances or {}
+
+        results = []
+        stage_rows = []
+        for stage, family in enumerate(priorities):
+            family_objective = pulp.lpSum(self.objective_components[family])
+            self._use_objective(family_objective, f"Lex_Objective_{family}")
+
+            start = time.perf_counter()
+            if stage == 0:
+                self.solve(backend=backend, time_limit=time_limit, msg=msg, anytime=anytime)
             else:
-                print("No optimal solution found. Please check the problem constraints.")
-
-    def debugVariables(self):
-        for variable in self.problem.variables():
-            print(f"{variable.name} = {variable.varValue}")
-
-    def calculateHours(self):
-        if self.problem.status != pulp.LpStatusOptimal:
-            print("No optimal solution found. Please check the problem constraints.")
-            return None
-
-        total_hours_all_staff = 0
-        staff_hours_worked = {}  # Dictionary to hold total hours worked for each staff member
-
-        for staff_member, info in self.staff_info.items():
-            total_hours_staff_member = 0
-            expected_hours = (info['work_percentage'] / 100) * self.MAX_HOURS_FULL_TIME
-
-            for week in range(self.num_weeks):
-                weekly_hours = sum(pulp.value(self.shifts[staff_member, week, day, shift_type]) * self.shift_hours[shift_type]
-                                for day in range(self.days_per_week)
-                                for shift_type in self.shift_hours)
-                total_hours_staff_member += weekly_hours
-
-            staff_hours_worked[staff_member] = total_hours_staff_member
-            total_hours_all_staff += total_hours_staff_member
-        return staff_hours_worked
-
-    def generate_textreport(self):
-        # Check the status of the solution and print the schedule
-        if self.problem.status == pulp.LpStatusOptimal:
-            print("An optimal solution was found.\n")
-
-            total_hours_all_staff = 0
-            overworked_staff = []
-            underworked_staff = []
+                # CBC 2.10 reports the MIP start of these stages as optimal without searching, so CBC starts cold
+                self.resolve(time_limit, msg, warm_start=self.highs_model is not None)
+            results.append({"family": family, "value": pulp.value(family_objective) if self.assignment is not None else None,
+                            "status": self.solve_info["status"], "nodes": self.solve_info["nodes"],
+                            "wall_time": round(time.perf_counter() - start, 2)})
+            if self.assignment is None:
+                break
+
+            if stage < len(priorities) - 1:
+                # Keep this optimum, with a little slack for continuous families
+                value = results[-1]["value"]
+                slack = max(tolerances.get(family, 0), 1e-6 * max(1.0, abs(value)))
+                name = f"Lex_{family}"
+                self._add_rows([pulp.LpConstraint(family_objective, pulp.LpConstraintGE, name, value - slack)])
+                stage_rows.append(name)
+
+        # Back to the original model, keeping the lexicographic schedule
+        self._remove_rows(stage_rows)
+        self._use_objective(self._objective_expression())
+        if self.assignment is not None:
+            # Optimal means every stage was solved to optimality; there is no bound on the weighted objective
+            optimal = all(result["status"] == "Optimal" for result in results)
+            nodes = [result["nodes"] for result in results]
+            self.solve_info = {"status": "Optimal" if optimal else "Feasible", "optimal": optimal,
+                               "objective": pulp.value(self.problem.objective), "best_bound": None, "gap": None,
+                               "nodes": None if None in nodes else sum(nodes)}
+
+        self.lexicographic_results = results
+        for result in results:
+            value = "-" if result["value"] is None else f"{result['value']:.6g}"
+            print(f"Stage {result['family']}: {value} ({result['status']}, {result['wall_time']}s)")
+        return results
+
+    def solve(self, backend="cbc", time_limit=None, msg=1, anytime=False, verbose=True):
+        """
+        Solves the model and loads the schedule.
 
-            # Calculate and print the hours worked per week per employee
-            for staff_member, info in self.staff_info.items():
-                total_hours_staff_member = 0
-                expected_hours = (info['work_percentage'] / 100) * self.MAX_HOURS_FULL_TIME
-                print(f"Hours worked by {staff_member} (Expected: {expected_hours}):")
+        With anytime=True a feasible schedule that is not (yet) proven optimal,
+        e.g. the incumbent when time_limit runs out, is accepted by all reports.
+        Its objective, best bound and gap are kept in self.solve_info either way.
+        With verbose=False nothing is printed; msg only controls the solver log.
+        """
+        self.anytime = anytime
+        conflicts = self.availability_conflicts()
+        if conflicts and verbose:
+            print("Availability conflicts, the schedule will be infeasible:")
+            for conflict in conflicts:
+                print(f"  {conflict}")
 
-                for week in range(self.num_weeks):
-                    weekly_hours = 0  # Initialize weekly_hours here before it's used
-                    for day in range(self.days_per_week):
-                        for shift_type in self.shift_hours:
-                            shift_value = pulp.value(self.shifts[staff_member, week, day, shift_type])
-                            if shift_value is not None:  # Check if the shift_value is not None
-                                weekly_hours += shift_value * self.shift_hours[shift_type]
-                    total_hours_staff_member += weekly_hours
-
-                discrepancy = total_hours_staff_member - expected_hours
-                if discrepancy > 0:
-                    print(f"Total hours worked by {staff_member}: {total_hours_staff_member} hours (Needs {discrepancy} fewer hours)\n")
-                    overworked_staff.append((staff_member, discrepancy))
-                else:
-                    print(f"Total hours worked by {staff_member}: {total_hours_staff_member} hours (Needs {-discrepancy} more hours)\n")
-                    underworked_staff.append((staff_member, -discrepancy))
-
-                total_hours_all_staff += total_hours_staff_member
-
-            print(f"Total hours worked by all staff: {total_hours_all_staff} hours\n")
-
-            # Suggest swaps
-            print("Suggested Swaps:")
-            for overworked in overworked_staff:
-                for underworked in underworked_staff:
-                    print(f"{overworked[0]} (Overworked by {overworked[1]} hours) can swap with {underworked[0]} (Underworked by {underworked[1]} hours)")
+        # Solve the LP problem and handle the solution
+        if backend == "highs":
+            # In-process HiGHS: no temporary LP file and no solver subprocess
+            from highs_backend import HighsModel
+            self.highs_model = HighsModel(self.problem, msg=msg)
+            self._shift_columns = None
+            self.highs_model.run(time_limit)
+        elif backend == "cbc":
+            self.highs_model = None
+            # Use PuLP's solver to solve the problem
+            solver = pulp.PULP_CBC_CMD(msg=msg, timeLimit=time_limit)
+            self.problem.solve(solver)
         else:
-            print("No optimal solution found. Please check the problem constraints.")
+            raise ValueError(f"Unknown solver backend: {backend}")
+
+        self._load_assignment()
+        self._record_solve_info()
+        if verbose:
+            self._print_solve_status()
+
+    def resolve(self, time_limit=None, msg=0, warm_start=True):
+        # Re-solve after changing the model, starting from the last solution unless warm_start is False
+        self._warm_solve(time_limit, msg, warm_start)
+        self._load_assignment()
+        self._record_solve_info()
+        self._print_solve_status()
+
+    def _warm_solve(self, time_limit, msg, warm_start=True):
+        # The live HiGHS model when solved with backend="highs", otherwise CBC with a warm start
+        if self.highs_model is not None:
+            if warm_start:
+                self.highs_model.set_start()
+            self.highs_model.run(time_limit)
+        else:
+            warm_start = warm_start and self.assignment is not None
+            self.problem.solve(pulp.PULP_CBC_CMD(msg=msg, timeLimit=time_limit, warmStart=warm_start))
 
-    def plot_schedule(self):
-        # Create the DataFrame
-        df_schedule = self.create_schedule_dataframe()
+    def improve_in_background(self, time_limit=None, round_time_limit=60, target_gap=None, on_improvement=None, msg=0):
+        """
+        Keeps improving the published schedule in a background thread.
 
-        self.plot_staff_schedule(df_schedule)
-        # Plot the schedule
-       # self.save_schedule_to_excel(df_schedule, 'staff_schedule.xlsx')
+        The current schedule stays in use (self.assignment and all reports)
+        while warm-started re-solves of round_time_limit seconds run in a
+        daemon thread. A round's schedule replaces the published one only if
+        its objective is better, and then on_improvement(schedule) is called.
+        Stops once the schedule is proven optimal, its gap is at most
+        target_gap, time_limit seconds have passed or stop_improving() is
+        called. Don't change or re-solve the model while it runs.
 
-    def create_schedule_dataframe(self):
-        schedule_data = []
-        start_date = datetime.date(2024, 1, 1)
+        Returns:
+        Thread: The background thread, also kept in self.background_improver.
+        """
+        if self.assignment is None:
+            raise RuntimeError("improve_in_background() needs a schedule to improve, call solve() first")
+        self.stop_improving()
+
+        stop = threading.Event()
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+
+        def improve():
+            while not stop.is_set() and not self._good_enough(target_gap):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                limits = [limit for limit in (round_time_limit, remaining) if limit is not None]
+                published_values = {var.name: var.varValue for var in self.problem.variables()}
+                if self.highs_model is not None:
+                    self.highs_model.stop_event = stop
+                self._warm_solve(min(limits, default=None), msg)
+                if stop.is_set() or not self._publish_if_better(on_improvement):
+                    # Keep warm starting from the published schedule
+                    for var in self.problem.variables():
+                        var.varValue = published_values.get(var.name)
+            if self.highs_model is not None:
+                self.highs_model.stop_event = None
+
+        self._stop_improving = stop
+        self.background_improver = threading.Thread(target=improve, name="schedule-improver", daemon=True)
+        self.background_improver.start()
+        return self.background_improver
+
+    def stop_improving(self, wait=True):
+        # Stop the background improvement; a HiGHS round in progress is cancelled, a CBC round runs to its limit
+        if self.background_improver is None:
+            return
+        self._stop_improving.set()
+        if self.highs_model is not None and self.background_improver.is_alive():
+            self.highs_model.cancel()
+        if wait:
+            self.background_improver.join()
+        self.background_improver = None
+
+    def _publish_if_better(self, on_improvement=None):
+        # Publish the schedule of the last background round unless it is worse than the published one
+        values = self._solution_values()
+        if values is None:
+            return False
+        objective = pulp.value(self.problem.objective)
+        published = self.solve_info["objective"]
+        improvement = (published - objective) * self.problem.sense  # sense is -1 when maximising
+        if improvement < -1e-9:
+            return False
+        # Built before publishing, so readers see the old or the new schedule with its own analytics
+        analytics = self._build_analytics(values)
+        solve_info = self._solve_info(True)
+        with self._publish_lock:
+            self._assignment, self._analytics, self.solve_info = values, analytics, solve_info
+        if improvement > 1e-9:
+            print(f"Improved schedule published: objective {objective:.6g} (was {published:.6g})")
+            if on_improvement is not None:
+                on_improvement(self)
+        return True
+
+    def _good_enough(self, target_gap):
+        info = self.solve_info
+        return info["optimal"] or (target_gap is not None and info["gap"] is not None and info["gap"] <= target_gap)
+
+    def simulate_absences(self, absence_rates=0.05, scenarios=10000, spell_days=3, workers=None, seed=0):
+        """
+        Monte Carlo test of the solved schedule against staff absences, see
+        robustness.simulate_absences(). Cover is limited by the model's own
+        yearly hour bounds and max-days windows.
 
+        Returns:
+        dict: The simulation summary, also printed.
+        """
+        from robustness import simulate_absences
+
+        if self.assignment is None:
+            raise ValueError("There is no schedule to test, solve the model first")
+        window = next(iter(self.max_days_caps.values()), (7, 7))[0]
+        max_hours = [self.hour_bounds.get(staff_member, (0, np.inf))[1] for staff_member in self.staff_info]
+        max_days = [self.max_days_caps.get(staff_member, (window, window))[1] for staff_member in self.staff_info]
+        result = simulate_absences(self.analytics, absence_rates, spell_days, max_hours, max_days, window,
+                                   scenarios=scenarios, workers=workers, seed=seed)
+
+        print(f"Absence simulation over {scenarios} scenarios:")
+        print(f"  Shifts lost to absence: {result['mean_shifts_lost']:.1f} on average")
+        print(f"  Unfilled after cover: {result['mean_unfilled_shifts']:.2f} on average, "
+              f"{result['p95_unfilled_shifts']:.0f} at the 95th percentile, {result['max_unfilled_shifts']} at most")
+        print(f"  Scenarios with unfilled shifts: {result['probability_unfilled']:.1%}")
+        print(f"  Scenarios where someone exceeds the overtime allowance: {result['probability_any_over_allowance']:.1%}")
         for staff_member in self.staff_info:
-            for week in range(self.num_weeks):
-                for day in range(self.days_per_week):
-                    for shift_type in self.shift_hours:
-                        shift_value = pulp.value(self.shifts[staff_member, week, day, shift_type])
-                        if shift_value is not None and shift_value == 1:
-                            date = start_date + datetime.timedelta(days=7 * week + day)
-                            schedule_data.append([staff_member, date, shift_type])
-
-        df = pd.DataFrame(schedule_data, columns=['Staff', 'Date', 'Shift'])
-        
-        return df
-
-    def plot_staff_schedule(self, df_long):
-        staff_hours_worked = self.calculateHours()  # Get hours worked for each staff member
-        if staff_hours_worked is None:
-            return  # Exit if no optimal solution was found
-
-        # Generate a timestamp
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file_path = f'staff_schedule_{timestamp}.png'
-
-        # Check DataFrame format
-        assert 'Staff' in df_long and 'Date' in df_long and 'Shift' in df_long, "DataFrame must have 'Staff', 'Date', and 'Shift' columns"
-
-        # Suppress font-related warnings
-        warnings.filterwarnings("ignore", category=UserWarning, message="Glyph .* missing from current font")
-
-        # Define custom legend labels and colors
-        legend_labels = {'D1': 'D1', 'D2': 'D2', 'Mx': 'Mx', 'Night': 'Night'}
-        legend_colors = {'D1': 'blue', 'D2': 'green', 'Mx': 'orange', 'Night': 'purple'}
+            print(f"  {staff_member}: {result['mean_overtime_hours'][staff_member]:.1f} overtime hours on average, "
+                  f"over the allowance in {result['probability_over_allowance'][staff_member]:.1%}")
+        return result
 
-        # Create a custom legend
-        custom_legend = [plt.Line2D([0], [0], marker='o', color='w', label=legend_labels[shift], markersize=10, markerfacecolor=legend_colors[shift]) for shift in legend_labels]
-
-
-        # Plotting
-        plt.figure(figsize=(20, 10))
-        ax = sns.scatterplot(data=df_long, x='Date', y='Staff', hue='Shift', s=100, palette=legend_colors, legend='full')
-
-        # Customize the axes
-        staff_list = df_long['Staff'].unique()
-        plt.yticks(range(len(staff_list)), staff_list)
-        ax.invert_yaxis()  # Invert y axis so that the top staff member is at the top
-
-        # Add hours worked as annotations
-        for i, staff_member in enumerate(staff_list):
-            total_hours_worked = staff_hours_worked.get(staff_member, 0)
-            max_hours_allowed = self.staff_info[staff_member]['work_percentage'] / 100 * self.MAX_HOURS_FULL_TIME
-            # Format to limit to one decimal place
-            hours_text = f"{total_hours_worked:.1f}/{max_hours_allowed:.1f} hrs"
-            
-            # Subtract from the x position to move the text further to the left
-            x_offset = pd.Timedelta(days=15)  # Adjust as needed for your plot scale
-            y_position = i - 0.10  # Adjust this value to move the text up by a small fraction
-            
-            ax.text(df_long['Date'].min() - x_offset, y_position, hours_text, verticalalignment='top', fontsize=10, color='black')
-
-        y_labels = {staff: i for i, staff in enumerate(df_long['Staff'].unique())}
-
-        # Iterate through each staff member and draw lines for gaps greater than 5 days
-        # Iterate through each staff member and draw lines for gaps greater than 5 days
-        for staff_member in df_long['Staff'].unique():
-            staff_dates = df_long[df_long['Staff'] == staff_member]['Date'].drop_duplicates()
-            sorted_dates = sorted(mdates.date2num(staff_dates))  # Convert to Matplotlib date format and sort
-
-            for i in range(len(sorted_dates) - 1):
-                current_date = sorted_dates[i]
-                next_date = sorted_dates[i + 1]
-                gap = int(next_date - current_date)  # Convert gap to integer to remove decimals
+    def tile_year(self, offsets=None):
+        """
+        Repeats the solved rotation cycle over year_weeks weeks, see rotation.tile_cycle().
 
-                if gap > 5:
-                    # Coordinates for the start and end points of the line
-                    y_value = y_labels[staff_member]  # Get the numerical y-coordinate
-                    start_point = (mdates.num2date(current_date), y_value)
-                    end_point = (mdates.num2date(next_date), y_value)
+        Parameters:
+        offsets (dict): Start week in the cycle per staff member, default 0.
 
-                    # Draw a line between the points
-                    ax.plot([start_point[0], end_point[0]], [start_point[1], end_point[1]], color='black')
+        Returns:
+        SolutionReport: The year schedule, with the same reports and Excel export as a solved schedule.
+        """
+        from reporting import SolutionReport
+        from rotation import coverage_gaps, tile_cycle
+
+        if self.assignment is None:
+            raise ValueError("There is no cycle to tile, solve the model first")
+        year = tile_cycle(self.assignment, self.days_per_week, self.year_weeks, offsets, list(self.staff_info))
+        # Offsets that differ within a shift type move people out of their slot in the cycle
+        gaps = coverage_gaps(year, list(self.shift_hours))
+        if gaps:
+            day, shift_type, count = gaps[0]
+            print(f"Warning: the offsets break coverage on {len(gaps)} shifts, "
+                  f"the first is {shift_type} on {day_label(day)} with {count} staff")
+        analytics = ScheduleAnalytics(year, self.staff_info, self.shift_hours, self.days_per_week,
+                                      self.MAX_HOURS_FULL_TIME)
+        return SolutionReport(analytics, self.solve_info)
+
+    def export_bundle(self, directory):
+        """
+        Exports the built model to a bundle directory (gzipped MPS, index map
+        and manifest) to be solved elsewhere with solve_bundle.py, see bundle.py.
+        """
+        from bundle import export_bundle
+        return export_bundle(self, directory)
 
-                    # Annotate the line with the gap, adjusting y_value as needed
-                    mid_point = (start_point[0] + (end_point[0] - start_point[0]) / 2, y_value)
-                    fontweight = 'bold' if gap > 14 else 'normal'
-                    ax.text(mid_point[0], mid_point[1] + 0.1, f"{gap}d", ha='center', va='bottom', fontsize=8, color='black', fontweight=fontweight)
+    def load_solution(self, directory, solution_path=None):
+        """
+        Loads the solution of an exported bundle back into this model.
 
-            
-        plt.xlabel('Date')
-        plt.ylabel('Staff')
-        plt.title('Staff Shift Schedule')
+        The model must be the one that was exported (same roster and
+        constraints); nothing is rebuilt, the values are copied into the PuLP
+        variables and the schedule, so reports, resolve() and
+        solution_pool() work as after solve().
+        """
+        from bundle import read_solution, solution_assignment
 
-        # Add the custom legend
-        plt.legend(handles=custom_legend, title='Shifts', bbox_to_anchor=(1.15, 1), loc='upper left')
+        values, solve_info, manifest, index = read_solution(directory, solution_path)
+        if (list(manifest["staff_info"]) != list(self.staff_info) or list(manifest["shift_hours"]) != list(self.shift_hours)
+                or (manifest["num_weeks"], manifest["days_per_week"]) != (self.num_weeks, self.days_per_week)):
+            raise ValueError(f"The bundle in {directory} was exported from a different roster")
 
-        plt.grid(True, which='major', linestyle='--', linewidth=0.5)
-        plt.tight_layout()
+        mps_names = {name: mps_name for mps_name, name in index["columns"].items()}
+        for var in self.problem.variables():
+            var.varValue = None if values is None else values.get(mps_names.get(var.name), 0.0)
 
-        # Save the plot as a PNG file
-        plt.savefig(output_file_path, bbox_inches='tight')
-        plt.close()  # Close the figure
+        if solve_info["optimal"]:
+            self.problem.status, self.problem.sol_status = pulp.LpStatusOptimal, pulp.LpSolutionOptimal
+        elif values is not None:
+            self.problem.status, self.problem.sol_status = pulp.LpStatusNotSolved, pulp.LpSolutionIntegerFeasible
+        else:
+            statuses = {name: status for status, name in pulp.LpStatus.items()}
+            self.problem.status = statuses.get(solve_info["status"], pulp.LpStatusNotSolved)
+            self.problem.sol_status = pulp.LpSolutionNoSolutionFound
+        self.assignment = None if values is None else solution_assignment(values, manifest, index)
+        self.solve_info = solve_info
+        self._print_solve_status()
+
+    def _add_rows(self, rows):
+        # Add constraints to an already solved model (and its live HiGHS copy)
+        for row in rows:
+            self.problem += row
+        if self.highs_model is not None:
+            self.highs_model.add_constraints(rows)
+
+    def _remove_rows(self, names):
+        # Remove constraints that were added last with _add_rows
+        for name in names:
+            del self.problem.constraints[name]
+        if self.highs_model is not None:
+            self.highs_model.remove_last_rows(len(names))
+
+    def solve_lazy(self, backend="highs", time_limit=None, msg=0, max_rounds=50):
+        """
+        Solves without the window rows and adds back only those the roster violates.
 
+        Needs a model built with add_constraints(lazy_windows=True). Each round
+        scans the incumbent for violated windows, adds those rows (plus the
+        windows overlapping them) and re-solves from the previous solution
+        until no window is violated or max_rounds is reached.
 
-    def export_schedule_to_excel(self, output_file_path):
+        Returns:
+        dict: Number of solve rounds and window rows added, also kept in self.lazy_stats.
+        """
+        self.lazy_stats = {"rounds": 1, "rows_added": 0}
+        self.solve(backend=backend, time_limit=time_limit, msg=msg)
+
+        while self.lazy_stats["rounds"] < max_rounds and self.assignment is not None:
+            rows = []
+            for name, staff_member, shift_types, window, max_shifts in self.lazy_window_specs:
+                for start_day in self._violated_windows(staff_member, shift_types, window, max_shifts):
+                    shift_sum = self._window_expression(staff_member, shift_types, start_day, window)
+                    rows.append(pulp.LpConstraint(shift_sum, pulp.LpConstraintLE, f"{name}_{window}d_{staff_member}_Day{start_day}", max_shifts))
+            if not rows:
+                break
+
+            self._add_rows(rows)
+            self.lazy_stats["rows_added"] += len(rows)
+            self.lazy_stats["rounds"] += 1
+            self.resolve(time_limit, msg)
+
+        print(f"Lazy windows: {self.lazy_stats['rounds']} rounds, {self.lazy_stats['rows_added']} rows added")
+        return self.lazy_stats
+
+    def solution_pool(self, k=5, tolerance=100, min_distance=20, time_limit=None, msg=0):
         """
-        Exports the schedule data to an Excel file.
+        Finds up to k diverse schedules close to the best one.
 
-        Parameters:
-        output_file_path (str): The file path to save the output Excel file.
+        Starting from the solved schedule, the objective is bounded to within
+        tolerance (in objective units, e.g. 100 is one extra isolated day) of
+        it, and after every schedule found a diversity cut asks the next one to
+        differ in at least min_distance shift assignments from all previous
+        ones. Each alternative is a warm-started re-solve of the same model;
+        the cuts are removed again and the best schedule restored at the end.
 
         Returns:
-        None
+        list: One dict per schedule with its objective, Hamming distance to the
+        best schedule, assignment array and KPI summary, also kept in
+        self.solution_pool_results.
         """
+        if self.assignment is None:
+            raise RuntimeError("solution_pool() needs a solved schedule, call solve() first")
+
+        eligible = [var for (staff_member, week, day, shift_type), var in self.shifts.items()
+                    if shift_type == self.staff_info[staff_member]["shift"]]
+        best_values = {var.name: var.varValue for var in self.problem.variables()}
+        best_status = self.problem.status, self.problem.sol_status
+        best_info = self.solve_info
+        best_objective = pulp.value(self.problem.objective)
+        pool = [self._pool_entry(best_objective)]
+
+        # Families with a negligible weight (like shift_distribution's 1e-7) are left out of the bound row,
+        # such tiny coefficients next to 100s make HiGHS presolve report the model infeasible
+        largest = max(abs(weight) for weight in self.objective_weights.values())
+        bound_weights = {family: weight if abs(weight) >= 1e-6 * largest else 0
+                         for family, weight in self.objective_weights.items()}
+        bounded_objective = self._objective_expression(bound_weights)
+        objective_bound = pulp.LpConstraint(bounded_objective, pulp.LpConstraintGE, "Pool_Objective_Bound",
+                                            pulp.value(bounded_objective) - tolerance)
+        added = ["Pool_Objective_Bound"]
+        self._add_rows([objective_bound])
+
+        while len(pool) < k:
+            # Hamming distance to the last schedule: flipped ones plus flipped zeros
+            last = [round(var.varValue or 0) for var in eligible]
+            distance = pulp.lpSum((1 - 2 * value) * var for var, value in zip(eligible, last)) + sum(last)
+            name = f"Pool_Diversity_{len(pool)}"
+            self._add_rows([pulp.LpConstraint(distance, pulp.LpConstraintGE, name, min_distance)])
+            added.append(name)
+
+            self.resolve(time_limit, msg)
+            if self.assignment is None:
+                break
+            pool.append(self._pool_entry(pulp.value(self.problem.objective), pool[0]["assignment"]))
+
+        # Restore the model and the best schedule
+        self._remove_rows(added)
+        for var in self.problem.variables():
+            var.varValue = best_values.get(var.name)
+        self.assignment = pool[0]["assignment"]
+        self.problem.status, self.problem.sol_status = best_status
+        self.solve_info = best_info
+
+        self.solution_pool_results = pool
+        for i, entry in enumerate(pool):
+            kpis = entry["kpis"]
+            print(f"Schedule {i + 1}: objective {entry['objective']:.4f}, distance {entry['distance']}, "
+                  f"isolated days {kpis['isolated_days']}, max hours deviation {kpis['max_hours_deviation']:.1f}, "
+                  f"weekends worked {kpis['min_weekends_worked']}-{kpis['max_weekends_worked']}")
+        return pool
+
+    def _pool_entry(self, objective, best_assignment=None):
+        distance = 0 if best_assignment is None else int(np.abs(self.assignment - best_assignment).sum())
+        return {"objective": objective, "distance": distance, "assignment": self.assignment.copy(),
+                "kpis": self.analytics.kpi_summary()}
+
+    def _violated_windows(self, staff_member, shift_types, window, max_shifts):
+        # Vectorised window sums over the solved assignment, wrapping past the last day
+        staff_index = list(self.staff_info).index(staff_member)
+        shift_indices = [list(self.shift_hours).index(shift_type) for shift_type in shift_types]
+        daily = self.assignment[staff_index][:, shift_indices].sum(axis=1)
+        cumulative = np.concatenate(([0], np.cumsum(np.concatenate((daily, daily[:window - 1])))))
+        window_sums = cumulative[window:window + len(daily)] - cumulative[:len(daily)]
+        violated = window_sums > max_shifts
+
+        # Also add the overlapping windows, otherwise the next solve tends to just move the violation over a day
+        nearby = np.convolve(np.concatenate((violated[-(window - 1):], violated, violated[:window - 1])),
+                             np.ones(2 * window - 1), mode="valid") > 0
+        already_added = self._lazy_windows_added.setdefault((staff_member, tuple(shift_types), window), set())
+        starts = [start for start in np.nonzero(nearby)[0].tolist() if start not in already_added]
+        already_added.update(starts)
+        return starts
+
+    def _window_expression(self, staff_member, shift_types, start_day, window):
+        num_days = self.num_weeks * self.days_per_week
+        return pulp.lpSum(self.shifts[(staff_member, *divmod(day_index % num_days, self.days_per_week), shift_type)]
+                          for day_index in range(start_day, start_day + window)
+                          for shift_type in shift_types)
+
+    def _print_solve_status(self):
+        # Check if an optimal solution was found
+        info = self.solve_info
+        if info["optimal"]:
+            print("An optimal solution was found.")
+        elif info["status"] == "Feasible":
+            bound = "unknown" if info["best_bound"] is None else f"{info['best_bound']:.6g}"
+            gap = "unknown" if info["gap"] is None else f"{info['gap']:.2%}"
+            print(f"A feasible solution was found: objective {info['objective']:.6g}, best bound {bound}, gap {gap}.")
+        else:
+            print("No optimal solution found. Please check the problem constraints.")
 
-        # Constants
-        start_date = datetime.datetime(2024, 1, 1)
+    def _record_solve_info(self):
+        """
+        Records status, objective, best bound, gap and (HiGHS only) the
+        branch-and-bound node count of the loaded schedule.
 
-        # Prepare the header
-        header = ['Staff Member', 'Shift', 'Total Hours']
-        dates = [start_date + datetime.timedelta(days=week * self.days_per_week + day) 
-                 for week in range(self.num_weeks) 
-                 for day in range(self.days_per_week)]
-        date_headers = [date.strftime('%Y-%m-%d') for date in dates]
-        header.extend(date_headers)
+        The gap is |best bound - objective| / max(1, |objective|), so it stays
+        meaningful for this model's near-zero objectives. The best bound is
+        read from HiGHS; CBC through PuLP does not report it, so there it is
+        only known once the schedule is proven optimal.
+        """
+        self.solve_info = self._solve_info(self.assignment is not None)
+
+    def _solve_info(self, solved):
+        optimal = solved and self.problem.sol_status == pulp.LpSolutionOptimal
+        objective = best_bound = gap = None
+        if solved:
+            objective = pulp.value(self.problem.objective)
+            if self.highs_model is not None:
+                best_bound = self.highs_model.best_bound()
+            elif optimal:
+                best_bound = objective
+            if best_bound is not None:
+                gap = abs(best_bound - objective) / max(1.0, abs(objective))
+
+        if optimal:
+            status = "Optimal"
+        elif solved:
+            status = "Feasible"
+        else:
+            status = pulp.LpStatus[self.problem.status]
+        return {"status": status, "optimal": optimal, "objective": objective,
+                "best_bound": best_bound, "gap": gap,
+                "nodes": self.highs_model.node_count() if self.highs_model is not None else None}
 
-        # Prepare the data for each staff member
-        data = []
-        for staff_member, info in self.staff_info.items():
-            total_hours = sum(pulp.value(self.shifts[staff_member, week, day, shift_type]) * self.shift_hours[shift_type]
-                              for week in range(self.num_weeks)
-                              for day in range(self.days_per_week)
-                              for shift_type in self.shift_hours)
-            row = [staff_member, info['shift'], total_hours]
-            for week in range(self.num_weeks):
-                for day in range(self.days_per_week):
-                    shift_worked = next((shift_type for shift_type in self.shift_hours 
-                                         if pulp.value(self.shifts[staff_member, week, day, shift_type]) == 1), ' ')
-                    row.append(shift_worked)
-            data.append(row)
+    def _load_assignment(self):
+        self.assignment = self._solution_values()
 
-        # Create a DataFrame
-        df = pd.DataFrame(data, columns=header)
+    def _solution_values(self):
+        # Copy the shift variable values into a (staff, day, shift type) array, None without a solution
+        if self.problem.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+            return None
 
-        # Export to Excel
-        df.to_excel(output_file_path, index=False)
-        print(f"Schedule exported to {output_file_path}")
-    
-    def _compile_objective_function(self):
-        self.problem += pulp.lpSum(self.objective_function_components)
+        shape = (len(self.staff_info), self.num_weeks * self.days_per_week, len(self.shift_hours))
+        if self.highs_model is not None:
+            if self._shift_columns is None:
+                self._shift_columns = np.array([self.highs_model.index[var.name] for var in self.shifts.values()])
+            values = np.asarray(self.highs_model.values())[self._shift_columns]
+        else:
+            values = np.array([var.varValue if var.varValue is not None else 0.0 for var in self.shifts.values()])
+        return (values.reshape(shape) > 0.5).astype(np.int8)
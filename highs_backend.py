@@ -0,0 +1,198 @@
+import pulp
+
+try:
+    import highspy
+except ImportError:  # HiGHS is optional, CBC through PuLP stays the default
+    highspy = None
+
+
+# Map HiGHS model statuses onto the PuLP statuses the rest of the code checks
+_STATUS_MAP = {
+    "kOptimal": pulp.LpStatusOptimal,
+    "kInfeasible": pulp.LpStatusInfeasible,
+    "kUnbounded": pulp.LpStatusUnbounded,
+    "kUnboundedOrInfeasible": pulp.LpStatusInfeasible,
+}
+
+
+def highs_available():
+    return highspy is not None
+
+
+class HighsModel:
+    """
+    Keeps a PuLP problem alive inside an in-process HiGHS instance.
+
+    The model is passed to HiGHS as row-wise arrays (no LP/MPS file and no
+    solver subprocess) and the solution is written straight back into the
+    PuLP variables. The handle stays alive so bounds can be changed and the
+    model re-solved without rebuilding anything.
+
+    Parameters:
+    problem (LpProblem): The PuLP problem to load.
+    msg (bool): Whether HiGHS should print its log.
+    threads (int): Number of solver threads, None for the HiGHS default.
+    """
+
+    def __init__(self, problem, msg=True, threads=None):
+        if highspy is None:
+            raise ImportError("highspy is not installed, run 'pip install highspy' or use the CBC backend")
+
+        self.problem = problem
+        self.variables = problem.variables()
+        self.index = {variable.name: i for i, variable in enumerate(self.variables)}
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue("output_flag", bool(msg))
+        if threads is not None:
+            self.highs.setOptionValue("threads", threads)
+        self._cancelled = False
+        self.stop_event = None  # Also interrupt runs while this threading.Event is set
+        self.highs.cbMipInterrupt += self._interrupt
+        self._pass_model()
+
+    def _pass_model(self):
+        lp = highspy.HighsLp()
+        lp.num_col_ = len(self.variables)
+        lp.num_row_ = len(self.problem.constraints)
+
+        # Columns: objective coefficients, bounds and integrality
+        objective = self.problem.objective or pulp.LpAffineExpression()
+        col_cost = [0.0] * lp.num_col_
+        for variable, coefficient in objective.items():
+            col_cost[self.index[variable.name]] = coefficient
+        inf = highspy.kHighsInf
+        lp.col_cost_ = col_cost
+        lp.col_lower_ = [-inf if v.lowBound is None else v.lowBound for v in self.variables]
+        lp.col_upper_ = [inf if v.upBound is None else v.upBound for v in self.variables]
+        lp.integrality_ = [highspy.HighsVarType.kInteger if v.cat == pulp.LpInteger else highspy.HighsVarType.kContinuous
+                           for v in self.variables]
+        lp.offset_ = objective.constant
+        lp.sense_ = highspy.ObjSense.kMaximize if self.problem.sense == pulp.LpMaximize else highspy.ObjSense.kMinimize
+
+        # Rows: one CSR slice per constraint
+        row_lower, row_upper = [], []
+        starts, indices, values = [0], [], []
+        for constraint in self.problem.constraints.values():
+            lower, upper = self._row_bounds(constraint)
+            row_lower.append(lower)
+            row_upper.append(upper)
+            for variable, coefficient in constraint.items():
+                indices.append(self.index[variable.name])
+                values.append(coefficient)
+            starts.append(len(indices))
+
+        lp.row_lower_ = row_lower
+        lp.row_upper_ = row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.num_col_ = lp.num_col_
+        lp.a_matrix_.num_row_ = lp.num_row_
+        lp.a_matrix_.start_ = starts
+        lp.a_matrix_.index_ = indices
+        lp.a_matrix_.value_ = values
+        self.highs.passModel(lp)
+
+    def add_constraints(self, constraints):
+        # Append rows to the live model; they must only use columns it already has
+        lower, upper = [], []
+        starts, indices, values = [], [], []
+        for constraint in constraints:
+            low, up = self._row_bounds(constraint)
+            lower.append(low)
+            upper.append(up)
+            starts.append(len(indices))
+            for variable, coefficient in constraint.items():
+                indices.append(self.index[variable.name])
+                values.append(coefficient)
+        self.highs.addRows(len(lower), lower, upper, len(indices), starts, indices, values)
+
+    def remove_last_rows(self, count):
+        num_rows = self.highs.getNumRow()
+        self.highs.deleteRows(count, list(range(num_rows - count, num_rows)))
+
+    @staticmethod
+    def _row_bounds(constraint):
+        rhs = -constraint.constant
+        if constraint.sense == pulp.LpConstraintEQ:
+            return rhs, rhs
+        if constraint.sense == pulp.LpConstraintLE:
+            return -highspy.kHighsInf, rhs
+        return rhs, highspy.kHighsInf
+
+    def set_objective(self, objective):
+        # Swap the objective on the live model, keeping rows, columns and the last solution
+        col_cost = [0.0] * len(self.variables)
+        for variable, coefficient in objective.items():
+            col_cost[self.index[variable.name]] = coefficient
+        self.highs.changeColsCost(len(col_cost), list(range(len(col_cost))), col_cost)
+        self.highs.changeObjectiveOffset(objective.constant)
+
+    def change_bounds(self, variables, lower, upper):
+        # Change column bounds on the live model, e.g. to fix or release shifts
+        indices = [self.index[variable.name] for variable in variables]
+        self.highs.changeColsBounds(len(indices), indices, lower, upper)
+        for variable, low, up in zip(variables, lower, upper):
+            variable.lowBound, variable.upBound = low, up
+
+    def set_start(self, values=None):
+        # Pass a (partial) starting solution; defaults to the current PuLP values
+        if values is None:
+            values = [v.varValue if v.varValue is not None else 0.0 for v in self.variables]
+        solution = highspy.HighsSolution()
+        solution.col_value = list(values)
+        solution.value_valid = True
+        self.highs.setSolution(solution)
+
+    def run(self, time_limit=None):
+        # Always set, HiGHS keeps options between runs
+        self.highs.setOptionValue("time_limit", highspy.kHighsInf if time_limit is None else float(time_limit))
+        self._cancelled = False
+        self.highs.run()
+
+        model_status = self.highs.getModelStatus()
+        status = _STATUS_MAP.get(model_status.name, pulp.LpStatusNotSolved)
+
+        solution = self.highs.getSolution()
+        has_solution = solution.value_valid
+        if has_solution:
+            for variable, value in zip(self.variables, solution.col_value):
+                variable.varValue = value
+
+        self.problem.status = status
+        if status == pulp.LpStatusOptimal:
+            self.problem.sol_status = pulp.LpSolutionOptimal
+        elif has_solution:
+            self.problem.sol_status = pulp.LpSolutionIntegerFeasible
+        else:
+            self.problem.sol_status = pulp.LpSolutionNoSolutionFound
+        return status
+
+    def values(self):
+        return self.highs.getSolution().col_value
+
+    def best_bound(self):
+        # Best bound on the objective proven by the last MIP run (the dual bound), None if there is none
+        bound = self.highs.getInfo().mip_dual_bound
+        return bound if abs(bound) < highspy.kHighsInf else None
+
+    def node_count(self):
+        # Branch-and-bound nodes of the last MIP run
+        return self.highs.getInfo().mip_node_count
+
+    def relaxation_bound(self):
+        # Objective of the LP relaxation (the root bound before cuts), leaves the PuLP values alone
+        self.highs.setOptionValue("solve_relaxation", True)
+        try:
+            self.highs.run()
+            return self.highs.getInfo().objective_function_value
+        finally:
+            self.highs.setOptionValue("solve_relaxation", False)
+
+    def cancel(self):
+        # Ask a run in progress (e.g. in another thread) to stop and keep its incumbent
+        self._cancelled = True
+
+    def _interrupt(self, event):
+        # Set either way, HiGHS keeps the interrupt flag from the last cancelled run. The stop event is
+        # read here, not copied into _cancelled, so a stop set just before run() resets the flag isn't lost.
+        stopped = self.stop_event is not None and self.stop_event.is_set()
+        event.interrupt(self._cancelled or stopped)
@@ -38,9 +38,8 @@ shift_hours = {
     "Night": 10 # 2100 to 0700
 }
 
-print("Running the healthcare scheduling problem...")
-
 def main():
+    print("Running the healthcare scheduling problem...")
     schedule = HealthcareSchedule(num_weeks=52, days_per_week=7, staff_info=staff_info, shift_hours=shift_hours)
     schedule.add_constraints()
     schedule.set_objective()
@@ -0,0 +1,389 @@
+import datetime
+import pickle
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+REPORT_OUTPUTS = ("text", "schedule", "improvements", "plot", "excel")
+FILE_OUTPUTS = ("plot", "excel")
+
+
+# Reporting, plotting and export on top of a solved HealthcareSchedule.
+# All numbers come from the cached self.analytics (see analytics.py).
+# pandas, matplotlib and seaborn are imported inside the methods that use them
+# so building and solving a schedule never loads them.
+class ScheduleReporting:
+    def generate_report(self, outputs=REPORT_OUTPUTS, parallel=True, excel_path="Staff_Shift_Schedule_2024.xlsx",
+                        plot_path=None):
+        """
+        Generates the requested report outputs.
+
+        Parameters:
+        outputs (iterable): Any of "text", "schedule", "improvements" (printed) and
+        "plot", "excel" (files). Defaults to all of them.
+        parallel (bool): Render the plot and the Excel file concurrently in worker
+        processes, both from one pickled copy of the solution analytics.
+        excel_path (str): Where to write the Excel file.
+        plot_path (str): Where to write the plot, None for a timestamped file name.
+        """
+        unknown = set(outputs) - set(REPORT_OUTPUTS)
+        if unknown:
+            raise ValueError(f"Unknown report outputs: {', '.join(sorted(unknown))}")
+
+        # Only talk to the console when a console output was asked for (batch jobs stay quiet)
+        console = any(output not in FILE_OUTPUTS for output in outputs)
+
+        # Every output reports on one snapshot of the solution, so a schedule published meanwhile
+        # (see HealthcareSchedule.improve_in_background) can't mix into a running report
+        analytics, solve_info = self._report_snapshot()
+
+        # Check the status of the solution and print the schedule
+        if analytics is None or not self._reportable(analytics.assignment, solve_info):
+            if console:
+                print("No optimal solution found. Will not generate a report.")
+            return
+        report = SolutionReport(analytics, solve_info)
+
+        if console:
+            print(report._solution_heading() + "\n")
+        # Generate textual report as shown in your example
+        #   self.debugVariables()
+        if "text" in outputs:
+            report.generate_textreport()
+        if "schedule" in outputs:
+            report.print_schedule()
+        if "improvements" in outputs:
+            report.suggest_improvements()
+
+        paths = {"plot": plot_path, "excel": excel_path}
+        files = [output for output in FILE_OUTPUTS if output in outputs]
+        if parallel and len(files) > 1:
+            solution = pickle.dumps((analytics, solve_info))
+            with ProcessPoolExecutor(max_workers=len(files)) as pool:
+                for future in [pool.submit(_render_file, output, solution, paths[output], console)
+                               for output in files]:
+                    future.result()
+        else:
+            for output in files:
+                _render_with(report, output, paths[output], console)
+
+    def _report_snapshot(self):
+        # The analytics and solve info of one and the same schedule
+        return self.analytics, self.solve_info
+
+    def _has_report_solution(self):
+        return self._reportable(self.assignment, self.solve_info)
+
+    def _reportable(self, assignment, solve_info):
+        # Proven optimal schedules, or any feasible incumbent in anytime mode (see HealthcareSchedule.solve)
+        if assignment is None or solve_info is None:
+            return False
+        return solve_info["optimal"] or self.anytime
+
+    def suggest_improvements(self):
+        """
+        Analyzes the current scheduling solution and suggests improvements.
+        """
+        print("Suggested Improvements:")
+        
+        analytics = self.analytics
+
+        # Calculate total expected hours for all staff
+        total_expected_hours = analytics.expected_hours.sum()
+
+        # Calculate total actual hours worked by all staff
+        total_actual_hours = analytics.hours.sum()
+
+        # Calculate the shortfall or excess in hours
+        hours_difference = total_actual_hours - total_expected_hours
+
+        # If there's a significant shortfall, suggest hiring more staff
+        if hours_difference < -100:  # Arbitrary threshold for significant shortfall
+            print("- Consider hiring additional staff to cover the shortfall of", -hours_difference, "hours.")
+
+        # If there's a significant excess, suggest reducing work percentages or reassigning tasks
+        elif hours_difference > 100:  # Arbitrary threshold for significant excess
+            print("- Consider reducing work percentages or reassigning tasks to manage the excess of", hours_difference, "hours.")
+
+        # Check for staff members who are significantly overworked or underworked
+        for staff_member, discrepancy in zip(self.staff_info, analytics.hours_deviation):
+
+            # Suggest adjustments for individual staff members
+            if discrepancy > 50:  # Threshold for considering someone as overworked
+                print(f"- {staff_member} is overworked by {discrepancy} hours. Consider reducing workload.")
+            elif discrepancy < -50:  # Threshold for considering someone as underworked
+                print(f"- {staff_member} is underworked by {-discrepancy} hours. Consider increasing workload or reassigning tasks.")
+
+    def print_schedule(self):
+            # Check the status of the solution and print the schedule
+            if self._has_report_solution():
+                assignment = self.analytics.assignment
+                for week in range(self.num_weeks):
+                    print(f"Week {week + 1}:")
+                    for day in range(self.days_per_week):
+                        day_schedule = []
+                        for shift_index, shift_type in enumerate(self.shift_hours):
+                            # List of staff members working this shift on this day
+                            working = assignment[:, week * self.days_per_week + day, shift_index]
+                            working_staff = [staff_member for staff_member, works in zip(self.staff_info, working) if works]
+                            
+                            # Check for non-night workers assigned to night shifts
+                            if shift_type == "Night":
+                                non_night_workers = [staff_member for staff_member in working_staff if self.staff_info[staff_member]["shift"] != "Night"]
+                                if non_night_workers:
+                                    print(f"  Error: Non-night workers assigned to night shift: {', '.join(non_night_workers)}")
+
+                            if working_staff:
+                                day_schedule.append(f"{', '.join(working_staff)} {shift_type}")
+                        print(f"  Day {day + 1}: {' | '.join(day_schedule)}")
+                    print()  # Adds an empty line for better readability between weeks
+            else:
+                print("No optimal solution found. Please check the problem constraints.")
+
+    def debugVariables(self):
+        for variable in self.problem.variables():
+            print(f"{variable.name} = {variable.varValue}")
+
+    def calculateHours(self):
+        if not self._has_report_solution():
+            print("No optimal solution found. Please check the problem constraints.")
+            return None
+
+        # Dictionary to hold total hours worked for each staff member
+        return dict(zip(self.staff_info, self.analytics.hours.tolist()))
+
+    def generate_textreport(self):
+        # Check the status of the solution and print the schedule
+        if self._has_report_solution():
+            print(self._solution_heading() + "\n")
+
+            analytics = self.analytics
+            total_hours_all_staff = 0
+            overworked_staff = []
+            underworked_staff = []
+
+            # Print the hours worked per employee
+            for staff_member, total_hours_staff_member, expected_hours, discrepancy in zip(
+                    self.staff_info, analytics.hours.tolist(), analytics.expected_hours.tolist(), analytics.hours_deviation.tolist()):
+                print(f"Hours worked by {staff_member} (Expected: {expected_hours}):")
+                if discrepancy > 0:
+                    print(f"Total hours worked by {staff_member}: {total_hours_staff_member} hours (Needs {discrepancy} fewer hours)\n")
+                    overworked_staff.append((staff_member, discrepancy))
+                else:
+                    print(f"Total hours worked by {staff_member}: {total_hours_staff_member} hours (Needs {-discrepancy} more hours)\n")
+                    underworked_staff.append((staff_member, -discrepancy))
+
+                total_hours_all_staff += total_hours_staff_member
+
+            print(f"Total hours worked by all staff: {total_hours_all_staff} hours\n")
+
+            # Suggest swaps
+            print("Suggested Swaps:")
+            for overworked in overworked_staff:
+                for underworked in underworked_staff:
+                    print(f"{overworked[0]} (Overworked by {overworked[1]} hours) can swap with {underworked[0]} (Underworked by {underworked[1]} hours)")
+        else:
+            print("No optimal solution found. Please check the problem constraints.")
+
+    def plot_schedule(self, output_file_path=None):
+        # Create the DataFrame
+        df_schedule = self.create_schedule_dataframe()
+
+        self.plot_staff_schedule(df_schedule, output_file_path)
+        # Plot the schedule
+       # self.save_schedule_to_excel(df_schedule, 'staff_schedule.xlsx')
+
+    def create_schedule_dataframe(self):
+        import pandas as pd
+
+        schedule_data = []
+        start_date = datetime.date(2024, 1, 1)
+        shift_types = list(self.shift_hours)
+
+        for staff_member, shift_indices in zip(self.staff_info, self.analytics.shift_index):
+            for day_index in np.nonzero(shift_indices >= 0)[0].tolist():
+                date = start_date + datetime.timedelta(days=day_index)
+                schedule_data.append([staff_member, date, shift_types[shift_indices[day_index]]])
+
+        df = pd.DataFrame(schedule_data, columns=['Staff', 'Date', 'Shift'])
+        
+        return df
+
+    def plot_staff_schedule(self, df_long, output_file_path=None):
+        import pandas as pd
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        staff_hours_worked = self.calculateHours()  # Get hours worked for each staff member
+        if staff_hours_worked is None:
+            return  # Exit if no optimal solution was found
+
+        # Generate a timestamped file name unless a path was given
+        if output_file_path is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_file_path = f'staff_schedule_{timestamp}.png'
+
+        # Check DataFrame format
+        assert 'Staff' in df_long and 'Date' in df_long and 'Shift' in df_long, "DataFrame must have 'Staff', 'Date', and 'Shift' columns"
+
+        # Suppress font-related warnings
+        warnings.filterwarnings("ignore", category=UserWarning, message="Glyph .* missing from current font")
+
+        # Define custom legend labels and colors
+        legend_labels = {'D1': 'D1', 'D2': 'D2', 'Mx': 'Mx', 'Night': 'Night'}
+        legend_colors = {'D1': 'blue', 'D2': 'green', 'Mx': 'orange', 'Night': 'purple'}
+
+        # Create a custom legend
+        custom_legend = [plt.Line2D([0], [0], marker='o', color='w', label=legend_labels[shift], markersize=10, markerfacecolor=legend_colors[shift]) for shift in legend_labels]
+
+
+        # Plotting
+        plt.figure(figsize=(20, 10))
+        ax = sns.scatterplot(data=df_long, x='Date', y='Staff', hue='Shift', s=100, palette=legend_colors, legend='full')
+
+        # Customize the axes
+        staff_list = df_long['Staff'].unique()
+        plt.yticks(range(len(staff_list)), staff_list)
+        ax.invert_yaxis()  # Invert y axis so that the top staff member is at the top
+
+        # Add hours worked as annotations, against the same (cycle scaled) expected hours as the text report
+        expected_hours = dict(zip(self.staff_info, self.analytics.expected_hours.tolist()))
+        for i, staff_member in enumerate(staff_list):
+            total_hours_worked = staff_hours_worked.get(staff_member, 0)
+            max_hours_allowed = expected_hours[staff_member]
+            # Format to limit to one decimal place
+            hours_text = f"{total_hours_worked:.1f}/{max_hours_allowed:.1f} hrs"
+            
+            # Subtract from the x position to move the text further to the left
+            x_offset = pd.Timedelta(days=15)  # Adjust as needed for your plot scale
+            y_position = i - 0.10  # Adjust this value to move the text up by a small fraction
+            
+            ax.text(df_long['Date'].min() - x_offset, y_position, hours_text, verticalalignment='top', fontsize=10, color='black')
+
+        y_labels = {staff: i for i, staff in enumerate(df_long['Staff'].unique())}
+        start_date = datetime.date(2024, 1, 1)
+
+        # Iterate through each staff member and draw lines for gaps greater than 5 days
+        for staff_member, gaps in zip(self.staff_info, self.analytics.gaps):
+            if staff_member not in y_labels:
+                continue
+
+            for day_index, next_day_index, gap in gaps:
+                if gap > 5:
+                    # Coordinates for the start and end points of the line
+                    y_value = y_labels[staff_member]  # Get the numerical y-coordinate
+                    start_point = (start_date + datetime.timedelta(days=day_index), y_value)
+                    end_point = (start_date + datetime.timedelta(days=next_day_index), y_value)
+
+                    # Draw a line between the points
+                    ax.plot([start_point[0], end_point[0]], [start_point[1], end_point[1]], color='black')
+
+                    # Annotate the line with the gap, adjusting y_value as needed
+                    mid_point = (start_point[0] + (end_point[0] - start_point[0]) / 2, y_value)
+                    fontweight = 'bold' if gap > 14 else 'normal'
+                    ax.text(mid_point[0], mid_point[1] + 0.1, f"{gap}d", ha='center', va='bottom', fontsize=8, color='black', fontweight=fontweight)
+
+            
+        plt.xlabel('Date')
+        plt.ylabel('Staff')
+        plt.title('Staff Shift Schedule')
+
+        # Add the custom legend
+        plt.legend(handles=custom_legend, title='Shifts', bbox_to_anchor=(1.15, 1), loc='upper left')
+
+        plt.grid(True, which='major', linestyle='--', linewidth=0.5)
+        plt.tight_layout()
+
+        # Save the plot as a PNG file
+        plt.savefig(output_file_path, bbox_inches='tight')
+        plt.close()  # Close the figure
+
+
+    def export_schedule_to_excel(self, output_file_path, announce=True):
+        """
+        Exports the schedule data to an Excel file.
+
+        Parameters:
+        output_file_path (str): The file path to save the output Excel file.
+        announce (bool): Print where the file was written.
+
+        Returns:
+        None
+        """
+
+        import pandas as pd
+
+        # Constants
+        start_date = datetime.datetime(2024, 1, 1)
+
+        # Prepare the header
+        header = ['Staff Member', 'Shift', 'Total Hours']
+        dates = [start_date + datetime.timedelta(days=week * self.days_per_week + day) 
+                 for week in range(self.num_weeks) 
+                 for day in range(self.days_per_week)]
+        date_headers = [date.strftime('%Y-%m-%d') for date in dates]
+        header.extend(date_headers)
+
+        # Prepare the data for each staff member
+        data = []
+        analytics = self.analytics
+        for (staff_member, info), total_hours, shifts_worked in zip(self.staff_info.items(), analytics.hours.tolist(),
+                                                                    analytics.shift_labels(off=' ')):
+            row = [staff_member, info['shift'], total_hours]
+            row.extend(shifts_worked)
+            data.append(row)
+
+        # Create a DataFrame
+        df = pd.DataFrame(data, columns=header)
+
+        # Export to Excel
+        df.to_excel(output_file_path, index=False)
+        if announce:
+            print(f"Schedule exported to {output_file_path}")
+
+
+    def _solution_heading(self):
+        if self.solve_info is None:
+            return "Reporting on a loaded solution."
+        if self.solve_info["optimal"]:
+            return "An optimal solution was found."
+        gap = self.solve_info["gap"]
+        return f"A feasible solution was found (gap {'unknown' if gap is None else f'{gap:.2%}'})."
+
+
+class SolutionReport(ScheduleReporting):
+    """
+    Reports for a solution without its PuLP model, e.g. in a report worker
+    process or for a solution imported from a model bundle (see bundle.py).
+
+    Parameters:
+    analytics (ScheduleAnalytics): The solution to report on.
+    solve_info (dict): Status, objective, best bound and gap, if known.
+    """
+
+    def __init__(self, analytics, solve_info=None):
+        self.analytics = analytics
+        self.assignment = analytics.assignment
+        self.solve_info = solve_info
+        self.staff_info = analytics.staff_info
+        self.shift_hours = analytics.shift_hours
+        self.num_weeks = analytics.num_weeks
+        self.days_per_week = analytics.days_per_week
+        self.MAX_HOURS_FULL_TIME = analytics.max_hours_full_time
+
+    def _reportable(self, assignment, solve_info):
+        return True
+
+
+def _render_with(report, output, path, announce=True):
+    if output == "plot":
+        report.plot_schedule(path)
+    else:
+        report.export_schedule_to_excel(path, announce)
+
+
+def _render_file(output, solution, path, announce=True):
+    # Runs in a report worker process
+    _render_with(SolutionReport(*pickle.loads(solution)), output, path, announce)
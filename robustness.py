@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def simulate_absences(analytics, absence_rates=0.05, spell_days=3, max_hours=None, max_days=None, window=7,
+                      scenarios=10000, batch_size=1000, workers=None, seed=0):
+    """
+    Monte Carlo estimate of how a solved roster holds up against sick leave.
+
+    Every scenario samples absence spells of spell_days days per staff member
+    so that each is absent absence_rates of the days on average. The shifts
+    of absent staff are offered, day by day, to colleagues of the same shift
+    type who are present, not already working that day, stay within their
+    yearly max_hours and work at most max_days days in every window of
+    consecutive days. The colleague with the fewest cover hours so far takes
+    it; shifts nobody can take stay unfilled. Cover hours are overtime and
+    are compared with overtime_allowance_hrs from staff_info.
+
+    Scenarios run in batches of batch_size, vectorised over the scenarios of
+    a batch, and the batches are spread over a process pool.
+
+    Parameters:
+    analytics (ScheduleAnalytics): The solved schedule.
+    absence_rates (float or dict): Share of days absent, for everyone or per staff member.
+    spell_days (int): Length of one absence spell in days.
+    max_hours (array): Yearly hour limit per staff member, default unlimited.
+    max_days (array): Days allowed per window per staff member, default window (no limit).
+    workers (int): Worker processes, None for one per CPU and 0 to run in-process.
+    seed (int): Seed of the scenario generator; the result doesn't depend on workers.
+
+    Returns:
+    dict: Summary (shifts lost, unfilled shifts, overtime and allowance
+    breaches per staff member) plus the per-scenario "unfilled" and
+    "overtime" arrays.
+    """
+    staff = analytics.staff
+    if isinstance(absence_rates, dict):
+        rates = np.array([absence_rates.get(name, absence_rates.get(name.strip(), 0.0)) for name in staff], dtype=float)
+    else:
+        rates = np.full(len(staff), float(absence_rates))
+    if ((rates < 0) | (rates >= 1)).any():
+        raise ValueError("Absence rates must be at least 0 and below 1")
+
+    plan = {
+        "assignment": analytics.assignment,
+        "shift_hours": np.array([analytics.shift_hours[shift_type] for shift_type in analytics.shift_types], dtype=float),
+        "roles": np.array([analytics.shift_types.index(info["shift"]) for info in analytics.staff_info.values()]),
+        "start_rates": rates / spell_days,
+        "spell_days": spell_days,
+        "max_hours": np.full(len(staff), np.inf) if max_hours is None else np.asarray(max_hours, dtype=float),
+        "max_days": np.full(len(staff), window) if max_days is None else np.asarray(max_days),
+        "window": window,
+    }
+
+    sizes = [min(batch_size, scenarios - start) for start in range(0, scenarios, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers == 0:
+        results = [_simulate_batch(plan, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_batch, [plan] * len(sizes), sizes, seeds))
+
+    lost = np.concatenate([result[0] for result in results])
+    unfilled = np.concatenate([result[1] for result in results])
+    overtime = np.concatenate([result[2] for result in results])
+    allowance = np.array([info.get("overtime_allowance_hrs", 0) for info in analytics.staff_info.values()], dtype=float)
+    over_allowance = overtime > allowance
+
+    return {
+        "scenarios": scenarios,
+        "mean_shifts_lost": float(lost.mean()),
+        "mean_unfilled_shifts": float(unfilled.mean()),
+        "p95_unfilled_shifts": float(np.percentile(unfilled, 95)),
+        "max_unfilled_shifts": int(unfilled.max()),
+        "probability_unfilled": float((unfilled > 0).mean()),
+        "mean_overtime_hours": dict(zip(staff, overtime.mean(axis=0).tolist())),
+        "p95_overtime_hours": dict(zip(staff, np.percentile(overtime, 95, axis=0).tolist())),
+        "probability_over_allowance": dict(zip(staff, over_allowance.mean(axis=0).tolist())),
+        "probability_any_over_allowance": float(over_allowance.any(axis=1).mean()),
+        "unfilled": unfilled,
+        "overtime": overtime,
+    }
+
+
+def _simulate_batch(plan, size, seed):
+    # Runs in a worker process: one batch of scenarios, vectorised over the scenarios
+    rng = np.random.default_rng(seed)
+    assignment = plan["assignment"].astype(bool)
+    num_staff, num_days, _ = assignment.shape
+    shift_hours, roles, window = plan["shift_hours"], plan["roles"], plan["window"]
+    worked = assignment.any(axis=2)
+    shift_index = assignment.argmax(axis=2)
+
+    # Absent on a day when a spell started on it or on one of the spell_days - 1 days before
+    starts = rng.random((size, num_staff, num_days)) < plan["start_rates"][None, :, None]
+    started = np.cumsum(starts, axis=2)
+    started[:, :, plan["spell_days"]:] -= started[:, :, :-plan["spell_days"]].copy()
+    absent = started > 0
+
+    lost = absent & worked[None]
+    working = worked[None] & ~absent
+    hours = (working * (assignment @ shift_hours)[None]).sum(axis=2)
+    cover_hours = np.zeros((size, num_staff))
+    unfilled = np.zeros(size, dtype=int)
+    capped = (plan["max_days"] < window).any()
+    offsets = np.arange(-(window - 1), window)
+
+    for day in np.nonzero(lost.any(axis=(0, 1)))[0]:
+        days_around = (day + offsets) % num_days  # Windows wrap around the year end like in the model
+        for absent_staff in np.nonzero(lost[:, :, day].any(axis=0))[0]:
+            # Only the scenarios that lost this shift and only colleagues of the same shift type
+            rows = np.nonzero(lost[:, absent_staff, day])[0]
+            shift_type = shift_index[absent_staff, day]
+            pool = np.nonzero(roles == shift_type)[0]
+            grid = np.ix_(rows, pool)
+            candidates = (~absent[:, :, day][grid] & ~working[:, :, day][grid]
+                          & (hours[grid] + shift_hours[shift_type] <= plan["max_hours"][pool]))
+            if capped:
+                # Days worked in every window through this day, if this day were worked too
+                around = np.cumsum(working[np.ix_(rows, pool, days_around)], axis=2)
+                window_days = around[:, :, window - 1:] - np.concatenate(
+                    (np.zeros((len(rows), len(pool), 1), dtype=int), around[:, :, :window - 1]), axis=2)
+                candidates &= window_days.max(axis=2) + 1 <= plan["max_days"][pool]
+
+            covered = candidates.any(axis=1)
+            chosen = pool[np.where(candidates, cover_hours[grid], np.inf).argmin(axis=1)]
+            rows_covered, chosen = rows[covered], chosen[covered]
+            working[rows_covered, chosen, day] = True
+            hours[rows_covered, chosen] += shift_hours[shift_type]
+            cover_hours[rows_covered, chosen] += shift_hours[shift_type]
+            unfilled[rows[~covered]] += 1
+
+    return lost.sum(axis=(1, 2)), unfilled, cover_hours
@@ -0,0 +1,86 @@
+import csv
+import json
+import os
+
+
+# Used when a roster file does not define its own shift hours (e.g. CSV rosters)
+DEFAULT_SHIFT_HOURS = {
+    "D1": 13,  # 0700 to 2000
+    "D2": 13,  # 0800 to 2100
+    "Mx": 12,  # 1000 to 2200
+    "Night": 10 # 2100 to 0700
+}
+
+ROSTER_EXTENSIONS = (".json", ".yaml", ".yml", ".csv")
+
+
+def find_roster_files(paths):
+    # Expand directories into the roster files they contain, keeping the given order
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.lower().endswith(ROSTER_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
+
+
+def load_roster(path):
+    """
+    Loads a roster definition from a JSON, YAML or CSV file.
+
+    JSON and YAML files hold the HealthcareSchedule arguments (staff_info and
+    optionally shift_hours, num_weeks, days_per_week, name and availability,
+    either a file relative to the roster file or an inline table). CSV files hold
+    one staff member per row with the columns name, shift, work_percentage,
+    pref_consecutive_days and overtime_allowance_hrs.
+
+    Returns:
+    dict: The roster with name, num_weeks, days_per_week, staff_info and shift_hours.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    elif extension in (".yaml", ".yml"):
+        import yaml
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+    elif extension == ".csv":
+        data = {"staff_info": _load_staff_csv(path)}
+    else:
+        raise ValueError(f"Unsupported roster file: {path}")
+
+    roster = roster_from_dict(data, os.path.splitext(os.path.basename(path))[0])
+    if isinstance(roster["availability"], str):
+        roster["availability"] = os.path.join(os.path.dirname(path), roster["availability"])
+    return roster
+
+
+def roster_from_dict(data, default_name="roster"):
+    # Fill in the defaults for a roster given as a plain dict (file contents or a service request)
+    if not data or "staff_info" not in data:
+        raise ValueError(f"Roster {default_name} has no staff_info")
+
+    return {
+        "name": data.get("name", default_name),
+        "num_weeks": int(data.get("num_weeks", 52)),
+        "days_per_week": int(data.get("days_per_week", 7)),
+        "staff_info": data["staff_info"],
+        "shift_hours": data.get("shift_hours", DEFAULT_SHIFT_HOURS),
+        "availability": data.get("availability"),
+    }
+
+
+def _load_staff_csv(path):
+    staff_info = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            staff_info[row["name"]] = {
+                "shift": row["shift"],
+                "work_percentage": float(row["work_percentage"]),
+                "pref_consecutive_days": int(row.get("pref_consecutive_days") or 0),
+                "overtime_allowance_hrs": float(row.get("overtime_allowance_hrs") or 0),
+            }
+    return staff_info
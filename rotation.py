@@ -0,0 +1,39 @@
+import numpy as np
+
+
+def tile_cycle(assignment, days_per_week, year_weeks=52, offsets=None, staff=None):
+    """
+    Repeats a solved N-week rotation over a whole year.
+
+    Staff member s works, on day d of the year, what the cycle has on day
+    (d + 7 * offset) % cycle days, so an offset of k weeks starts that person
+    k weeks into their line. Without offsets everyone starts at week 0 and
+    the year keeps the cycle's coverage.
+
+    Parameters:
+    assignment (ndarray): (staff, cycle days, shift types) 0/1 array of the cycle.
+    year_weeks (int): Weeks of the tiled schedule.
+    offsets (dict): Start week in the cycle per staff member, default 0.
+    staff (list): Staff names in assignment order, needed with offsets.
+
+    Returns:
+    ndarray: (staff, year_weeks * days_per_week, shift types) 0/1 array.
+    """
+    num_staff, cycle_days, _ = assignment.shape
+    shifts = np.zeros(num_staff, dtype=int)
+    if offsets:
+        unknown = set(offsets) - set(staff)
+        if unknown:
+            raise ValueError(f"Unknown staff in the rotation offsets: {', '.join(sorted(unknown))}")
+        shifts = np.array([offsets.get(name, 0) * days_per_week for name in staff])
+
+    # Cycle day worked by every staff member on every day of the year
+    cycle_day = (np.arange(year_weeks * days_per_week)[None, :] + shifts[:, None]) % cycle_days
+    return assignment[np.arange(num_staff)[:, None], cycle_day]
+
+
+def coverage_gaps(assignment, shift_types):
+    # (day, shift type, staff count) for every day a shift type isn't covered by exactly one person
+    counts = assignment.sum(axis=0)
+    return [(day, shift_types[shift_index], int(counts[day, shift_index]))
+            for day, shift_index in zip(*np.nonzero(counts != 1))]
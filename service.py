@@ -0,0 +1,337 @@
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rosters import roster_from_dict
+
+
+RESULT_FILES = {
+    "result.json": "application/json",
+    "result.xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "result.png": "image/png",
+}
+
+
+def run_job(roster, options, result_dir, progress):
+    """
+    Builds, solves and reports one roster job inside a worker process.
+
+    Progress stages are sent back through the progress queue as (stage, info)
+    pairs; the result files are written to result_dir.
+    """
+    from batch import schedule_to_dict
+    from healthcare_schedule import HealthcareSchedule
+
+    start = time.perf_counter()
+    progress.put(("building", None))
+    schedule = HealthcareSchedule(num_weeks=roster["num_weeks"], days_per_week=roster["days_per_week"],
+                                  staff_info=roster["staff_info"], shift_hours=roster["shift_hours"],
+                                  availability=roster["availability"])
+    schedule.add_constraints()
+    schedule.set_objective()
+
+    progress.put(("solving", None))
+    schedule.solve(backend=options["backend"], time_limit=options["time_limit"], msg=0, anytime=True,
+                   verbose=False)
+
+    progress.put(("reporting", None))
+    os.makedirs(result_dir, exist_ok=True)
+    if schedule.assignment is not None:
+        # Serially: the job already runs in a daemonic worker, which can't start a report pool
+        schedule.generate_report(outputs=("excel", "plot"), parallel=False,
+                                 excel_path=os.path.join(result_dir, "result.xlsx"),
+                                 plot_path=os.path.join(result_dir, "result.png"))
+
+    result = {
+        "name": roster["name"],
+        "status": schedule.solve_info["status"],
+        "objective": schedule.solve_info["objective"],
+        "best_bound": schedule.solve_info["best_bound"],
+        "gap": schedule.solve_info["gap"],
+        "wall_time": round(time.perf_counter() - start, 2),
+        "schedule": schedule_to_dict(schedule),
+    }
+    # Written last, so a result.json in the store always means a finished job
+    with open(os.path.join(result_dir, "result.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+
+
+def _job_worker(roster, options, result_dir, job_id, events):
+    # Entry point of the worker process: forward progress and failures to the service
+    if hasattr(os, "setpgrp"):
+        # Own process group, so cancelling also stops the CBC subprocess
+        os.setpgrp()
+
+    class Progress:
+        def put(self, event):
+            events.put((job_id,) + event)
+
+    try:
+        run_job(roster, options, result_dir, Progress())
+    except Exception as error:
+        events.put((job_id, "failed", str(error)))
+
+
+def _terminate(process):
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            return
+        except ProcessLookupError:
+            pass
+    process.terminate()
+
+
+class SchedulingService:
+    """
+    Job queue and result store around HealthcareSchedule.
+
+    Jobs are queued by priority (higher first) and run in at most max_workers
+    solver processes at a time. A job whose roster and options match a queued,
+    running or already stored job returns that job instead of solving again.
+    Results live in store_dir/<job key>/ so they survive restarts.
+    """
+
+    def __init__(self, store_dir="job_store", max_workers=2):
+        self.store_dir = store_dir
+        self.max_workers = max_workers
+        self.jobs = {}
+        self.jobs_by_key = {}
+        self.queue = []
+        self.running = {}  # job id -> worker process
+        self.counter = itertools.count()
+        self.lock = threading.Condition()
+        self.context = multiprocessing.get_context("spawn")
+        self.events = self.context.Queue()
+        self.stopped = False
+        os.makedirs(store_dir, exist_ok=True)
+
+        threading.Thread(target=self._dispatch, daemon=True).start()
+        threading.Thread(target=self._listen, daemon=True).start()
+
+    def submit(self, request):
+        roster = roster_from_dict(request.get("roster"))
+        if not isinstance(roster["availability"], (dict, list, type(None))):
+            # A path would be read on the server, and the key would hash the path rather than the file
+            raise ValueError("Give the availability inline, as {staff: {date or day index: value}} or a "
+                             "(staff, day) matrix, not as a file")
+        options = {"backend": request.get("backend", "cbc"), "time_limit": request.get("time_limit")}
+        priority = int(request.get("priority", 0))
+        key = hashlib.sha256(json.dumps([roster, options], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+        with self.lock:
+            existing = self.jobs_by_key.get(key)
+            if existing is not None and existing["status"] in ("queued", "running", "done"):
+                return dict(self.public(existing), deduplicated=True)
+
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "key": key,
+                "name": roster["name"],
+                "priority": priority,
+                "status": "queued",
+                "stage": None,
+                "error": None,
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+            }
+            self.jobs[job["id"]] = job
+            self.jobs_by_key[key] = job
+
+            if os.path.exists(os.path.join(self.store_dir, key, "result.json")):
+                # Solved before (possibly by an earlier run of the service)
+                job.update(status="done", stage="cached", finished=time.time())
+            else:
+                job["roster"], job["options"] = roster, options
+                heapq.heappush(self.queue, (-priority, next(self.counter), job["id"]))
+                self.lock.notify_all()
+            return dict(self.public(job), deduplicated=False)
+
+    def cancel(self, job_id):
+        with self.lock:
+            job = self.jobs[job_id]
+            if job["status"] == "queued":
+                # Left in the heap, the dispatcher skips jobs that are no longer queued
+                job.update(status="cancelled", finished=time.time())
+            elif job["status"] == "running":
+                _terminate(self.running.pop(job_id))
+                job.update(status="cancelled", finished=time.time())
+                self.lock.notify_all()
+            return self.public(job)
+
+    def status(self, job_id):
+        with self.lock:
+            return self.public(self.jobs[job_id])
+
+    def list_jobs(self):
+        with self.lock:
+            return [self.public(job) for job in self.jobs.values()]
+
+    def result_path(self, job_id, file_name):
+        with self.lock:
+            job = self.jobs[job_id]
+            if job["status"] != "done" or file_name not in RESULT_FILES:
+                return None
+            path = os.path.join(self.store_dir, job["key"], file_name)
+        return path if os.path.exists(path) else None
+
+    @staticmethod
+    def public(job):
+        record = {name: value for name, value in job.items() if name not in ("roster", "options")}
+        start = job["started"] or job["submitted"]
+        record["elapsed"] = round((job["finished"] or time.time()) - start, 2)
+        return record
+
+    def shutdown(self):
+        with self.lock:
+            self.stopped = True
+            for process in self.running.values():
+                _terminate(process)
+            self.lock.notify_all()
+
+    def _dispatch(self):
+        with self.lock:
+            while not self.stopped:
+                self._reap()
+                while self.queue and len(self.running) < self.max_workers:
+                    job = self.jobs[heapq.heappop(self.queue)[2]]
+                    if job["status"] != "queued":
+                        continue
+                    process = self.context.Process(
+                        target=_job_worker,
+                        args=(job.pop("roster"), job.pop("options"), os.path.join(self.store_dir, job["key"]),
+                              job["id"], self.events),
+                        daemon=True,
+                    )
+                    process.start()
+                    self.running[job["id"]] = process
+                    job.update(status="running", stage="starting", started=time.time())
+                self.lock.wait(timeout=0.5)
+
+    def _reap(self):
+        # Mark finished worker processes as done or failed
+        for job_id, process in list(self.running.items()):
+            if process.is_alive():
+                continue
+            del self.running[job_id]
+            job = self.jobs[job_id]
+            if job["status"] != "running":
+                continue
+            result_file = os.path.join(self.store_dir, job["key"], "result.json")
+            if process.exitcode == 0 and os.path.exists(result_file) and job["error"] is None:
+                job.update(status="done", stage="done", finished=time.time())
+            else:
+                job.update(status="failed", finished=time.time(),
+                           error=job["error"] or f"Worker exited with code {process.exitcode}")
+
+    def _listen(self):
+        while True:
+            job_id, stage, info = self.events.get()
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if job is None or job["status"] != "running":
+                    continue
+                if stage == "failed":
+                    job["error"] = info
+                else:
+                    job["stage"] = stage
+                self.lock.notify_all()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    HTTP endpoints:
+
+    POST   /jobs                  submit {"roster": {...}, "priority": 0, "time_limit": 300, "backend": "cbc"}
+    GET    /jobs                  list jobs
+    GET    /jobs/<id>             status and progress of a job
+    DELETE /jobs/<id>             cancel a queued or running job
+    GET    /jobs/<id>/result.json schedule, status and objective (also result.xlsx and result.png)
+    """
+
+    service = None
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "Not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = self.service.submit(json.loads(self.rfile.read(length) or b"{}"))
+        except (ValueError, TypeError, AttributeError) as error:
+            return self._send_json(400, {"error": str(error)})
+        self._send_json(200 if job["deduplicated"] else 202, job)
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts == ["jobs"]:
+            return self._send_json(200, self.service.list_jobs())
+        if len(parts) < 2 or parts[0] != "jobs" or parts[1] not in self.service.jobs:
+            return self._send_json(404, {"error": "Not found"})
+        if len(parts) == 2:
+            return self._send_json(200, self.service.status(parts[1]))
+
+        path = self.service.result_path(parts[1], parts[2]) if len(parts) == 3 else None
+        if path is None:
+            return self._send_json(404, {"error": "No such result (yet)"})
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", RESULT_FILES[parts[2]])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_DELETE(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "jobs" or parts[1] not in self.service.jobs:
+            return self._send_json(404, {"error": "Not found"})
+        self._send_json(200, self.service.cancel(parts[1]))
+
+    def _send_json(self, code, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=8000, store_dir="job_store", max_workers=2):
+    handler = type("Handler", (ServiceHandler,), {"service": SchedulingService(store_dir, max_workers)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP scheduling service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--store-dir", default="job_store", help="Where results are stored and cached")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="Number of solver worker processes")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.store_dir, args.workers)
+    print(f"Scheduling service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.RequestHandlerClass.service.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
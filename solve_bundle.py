@@ -0,0 +1,76 @@
+import argparse
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pulp
+
+
+# Kept free of the scheduling code (and numpy/pandas) so it runs on a bare compute node with PuLP
+MANIFEST_FILE = "manifest.json"
+SOLUTION_FILE = "solution.json.gz"
+
+
+def solve_bundle(directory, solver=None, time_limit=None, msg=False, output=None):
+    """
+    Solves the model of a bundle written by HealthcareSchedule.export_bundle().
+
+    The MPS model is read back into PuLP and solved with any solver PuLP
+    finds locally (HiGHS if available, otherwise CBC). The nonzero column
+    values are written next to the bundle as solution.json.gz.
+
+    Returns:
+    dict: Status, objective and wall time of the solve.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        mps_path = os.path.join(tmp, "model.mps")
+        with gzip.open(os.path.join(directory, manifest["model"]), "rb") as source, open(mps_path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        variables, problem = pulp.LpProblem.fromMPS(mps_path, sense=manifest["sense"])
+
+    if solver is None:
+        solver = "HiGHS" if "HiGHS" in pulp.listSolvers(onlyAvailable=True) else "PULP_CBC_CMD"
+    problem.solve(pulp.getSolver(solver, msg=msg, timeLimit=time_limit))
+
+    if problem.sol_status == pulp.LpSolutionOptimal:
+        status = "Optimal"
+    elif problem.sol_status == pulp.LpSolutionIntegerFeasible:
+        status = "Feasible"
+    else:
+        status = pulp.LpStatus[problem.status]
+
+    solution = {
+        "model_sha256": manifest["model_sha256"],
+        "solver": solver,
+        "status": status,
+        "objective": pulp.value(problem.objective) if status in ("Optimal", "Feasible") else None,
+        "wall_time": round(time.perf_counter() - start, 2),
+        "values": {name: var.varValue for name, var in variables.items() if var.varValue},
+    }
+    with gzip.open(output or os.path.join(directory, SOLUTION_FILE), "wt", encoding="utf-8") as f:
+        json.dump(solution, f, separators=(",", ":"))
+    return {name: solution[name] for name in ("status", "objective", "wall_time")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve an exported model bundle.")
+    parser.add_argument("bundle", help="Bundle directory written by HealthcareSchedule.export_bundle()")
+    parser.add_argument("--solver", default=None, help=f"PuLP solver name, one of {', '.join(pulp.listSolvers())}")
+    parser.add_argument("-t", "--time-limit", type=float, default=None, help="Solver time limit in seconds")
+    parser.add_argument("-o", "--output", default=None, help="Solution file, default <bundle>/solution.json.gz")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the solver log")
+    args = parser.parse_args(argv)
+
+    result = solve_bundle(args.bundle, args.solver, args.time_limit, args.verbose, args.output)
+    print(f"{args.bundle}: {result['status']} (objective {result['objective']}, {result['wall_time']}s)")
+
+
+if __name__ == "__main__":
+    main()
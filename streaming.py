@@ -0,0 +1,369 @@
+import argparse
+import gzip
+import itertools
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from availability import FREE, load_availability
+from healthcare_schedule import (DAY_SHIFT_TOLERANCE, ISOLATED_DAY_WEIGHT, MAX_D1_DAYS_IN_7, MAX_HOURS_FULL_TIME,
+                                 MAX_HOURS_NIGHT_SHIFT, NIGHT_SHIFT_TOLERANCE, SHIFT_DISTRIBUTION_WEIGHT)
+from rosters import load_roster
+
+
+# The hour limits are yearly totals, horizons longer than this many weeks get them pro rata
+WEEKS_PER_YEAR = 52
+
+# Terms per line of the LP file, LP lines have no length limit but stay readable
+LP_LINE_TERMS = 8
+
+
+def write_model(path, num_weeks, days_per_week, staff_info, shift_hours, availability=None, year_weeks=None,
+                weights=None):
+    """
+    Writes the default scheduling model straight to an LP file, row by row.
+
+    Builds the same model as HealthcareSchedule.add_constraints() and
+    set_objective(), without any PuLP objects. Every constraint family is a
+    generator of rows and every row is written as soon as it is produced.
+    Memory stays flat in the number of weeks and staff. The longest row (a
+    staff member's shift count against the average) is streamed term by
+    term too. Shifts of another type than the staff member's own, and days
+    off, are never created as columns. Pinned shifts are columns fixed to 1.
+    Over more than WEEKS_PER_YEAR weeks the yearly hour limits are scaled by
+    num_weeks / WEEKS_PER_YEAR, so multi-year horizons stay feasible.
+    The file is gzipped when path ends in .gz.
+
+    Columns are named x_<staff>_<day>_<shift type> by index, with the day
+    counted over the whole schedule (week * days_per_week + day). See
+    solve_model_file() and model_assignment() to get the schedule back.
+
+    Only the default model is written: a rotation cycle (year_weeks) or
+    objective families other than isolated_days and shift_distribution raise
+    a ValueError instead of being left out silently.
+
+    Parameters:
+    availability (ndarray): Optional (staff, day) matrix of FREE, OFF and pinned
+    shift type indices, see availability.load_availability().
+    weights (dict): Weight per objective family, default ISOLATED_DAY_WEIGHT and SHIFT_DISTRIBUTION_WEIGHT.
+
+    Returns:
+    dict: Path and the number of rows, columns and nonzeros written.
+    """
+    if year_weeks is not None:
+        raise ValueError("write_model doesn't support rotation cycles (year_weeks), build them with HealthcareSchedule")
+    weights = {"isolated_days": ISOLATED_DAY_WEIGHT, "shift_distribution": SHIFT_DISTRIBUTION_WEIGHT, **(weights or {})}
+    unknown = set(weights) - {"isolated_days", "shift_distribution"}
+    if unknown:
+        raise ValueError(f"write_model doesn't support the objective families: {', '.join(sorted(unknown))}")
+
+    layout = _Layout(num_weeks, days_per_week, staff_info, shift_hours, availability)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="ascii") as f:
+        writer = _LpWriter(f)
+        writer.objective(_objective_terms(layout, weights))
+        f.write("Subject To\n")
+        for family in (_work_hours_rows, _isolated_day_rows, _weekend_work_rows, _shift_type_rows,
+                       _max_days_worked_rows, _shift_distribution_rows):
+            for name, terms, sense, rhs in family(layout):
+                writer.row(name, terms, sense, rhs)
+
+        f.write("Bounds\n")
+        for column in layout.pinned_columns():
+            f.write(f" {column} = 1\n")
+        writer.names("Binaries", _binary_columns(layout))
+        writer.names("Generals", layout.pinned_columns())
+        f.write("End\n")
+
+    # The shift_diff columns are the only continuous ones
+    columns = writer.columns + len(staff_info)
+    return {"path": path, "rows": writer.rows, "columns": columns, "nonzeros": writer.nonzeros}
+
+
+def solve_model_file(path, solver="highs", time_limit=None, msg=False):
+    """
+    Solves a model file written by write_model() with HiGHS or the CBC that ships with PuLP.
+
+    Returns:
+    tuple: (status, objective, values) with the nonzero column values by name.
+    """
+    if solver == "highs":
+        import highspy
+
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", bool(msg))
+        if time_limit is not None:
+            highs.setOptionValue("time_limit", float(time_limit))
+        highs.readModel(path)
+        highs.run()
+        status = highs.getModelStatus().name.lstrip("k")
+        solution = highs.getSolution()
+        if not solution.value_valid:
+            return status, None, None
+        values = {name: value for name, value in zip(highs.getLp().col_names_, solution.col_value) if value > 0.5}
+        return status, highs.getInfo().objective_function_value, values
+
+    import pulp
+
+    # The CBC binary shipped with PuLP is built without zlib, so it gets an uncompressed copy
+    with tempfile.TemporaryDirectory() as tmp:
+        lp_path = os.path.join(tmp, "model.lp")
+        solution_path = os.path.join(tmp, "solution.txt")
+        with (gzip.open if path.endswith(".gz") else open)(path, "rb") as source, open(lp_path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        command = [pulp.PULP_CBC_CMD().path, lp_path]
+        if time_limit is not None:
+            command += ["-sec", str(time_limit)]
+        command += ["-solve", "-solution", solution_path]
+        subprocess.run(command, check=True, stdout=None if msg else subprocess.DEVNULL)
+        with open(solution_path) as f:
+            header = f.readline().split()
+            values = {}
+            for line in f:
+                # "<index> <name> <value> <reduced cost>", infeasible columns are prefixed with **
+                fields = line.replace("**", "").split()
+                if float(fields[2]) > 0.5:
+                    values[fields[1]] = float(fields[2])
+
+    status = header[0]
+    if status == "Stopped":
+        status = "Feasible" if values else "NotSolved"
+    if status not in ("Optimal", "Feasible"):
+        return status, None, None
+    return status, float(header[-1]), values
+
+
+def model_assignment(values, num_staff, num_days, num_shift_types):
+    # (staff, day, shift type) 0/1 array from the solved x_<staff>_<day>_<shift type> columns
+    assignment = np.zeros((num_staff, num_days, num_shift_types), dtype=np.int8)
+    for name in values:
+        if name.startswith("x_"):
+            staff_index, day_index, shift_index = map(int, name[2:].split("_"))
+            assignment[staff_index, day_index, shift_index] = 1
+    return assignment
+
+
+class _Layout:
+    # Dimensions of the model and the column names, computed on the fly instead of stored per column
+    def __init__(self, num_weeks, days_per_week, staff_info, shift_hours, availability):
+        self.num_weeks = num_weeks
+        self.days_per_week = days_per_week
+        self.num_days = num_weeks * days_per_week
+        self.staff_info = staff_info
+        self.shift_types = list(shift_hours)
+        self.shift_hours = shift_hours
+        self.roles = [self.shift_types.index(info["shift"]) for info in staff_info.values()]
+        self.availability = availability
+        # Like HealthcareSchedule.hours_scale, but only multi-year horizons get more than one year of hours
+        self.hours_scale = max(1.0, num_weeks / WEEKS_PER_YEAR)
+
+    def shift(self, staff_index, day_index):
+        # Column of the staff member's own shift on a day, None when it is fixed to 0
+        if self.availability is not None and self.availability[staff_index, day_index] not in (FREE, self.roles[staff_index]):
+            return None
+        return f"x_{staff_index}_{day_index}_{self.roles[staff_index]}"
+
+    def shifts(self, staff_index):
+        for day_index in range(self.num_days):
+            column = self.shift(staff_index, day_index)
+            if column is not None:
+                yield day_index, column
+
+    def pinned_columns(self):
+        if self.availability is None:
+            return
+        for staff_index, day_index in zip(*np.nonzero(self.availability == np.array(self.roles)[:, None])):
+            yield f"x_{staff_index}_{day_index}_{self.roles[staff_index]}"
+
+
+class _LpWriter:
+    # Writes CPLEX LP sections to an open text file and counts the rows, declared columns and nonzeros
+    def __init__(self, f):
+        self.f = f
+        self.rows = 0
+        self.columns = 0
+        self.nonzeros = 0
+
+    def objective(self, terms):
+        self.f.write("Maximize\n obj:")
+        self._terms(terms)
+        self.f.write("\n")
+
+    def row(self, name, terms, sense, rhs):
+        self.f.write(f" {name}:")
+        self.nonzeros += self._terms(terms)
+        self.f.write(f" {sense} {rhs!r}\n")
+        self.rows += 1
+
+    def names(self, section, names):
+        self.f.write(f"{section}\n")
+        line = []
+        for name in names:
+            self.columns += 1
+            line.append(name)
+            if len(line) == LP_LINE_TERMS:
+                self.f.write(f" {' '.join(line)}\n")
+                line = []
+        if line:
+            self.f.write(f" {' '.join(line)}\n")
+
+    def _terms(self, terms):
+        # An empty expression is written as 0 times no column, which LP readers take as 0
+        count = 0
+        for coefficient, column in terms:
+            if count and count % LP_LINE_TERMS == 0:
+                self.f.write("\n ")
+            self.f.write(f" {'-' if coefficient < 0 else '+'} {abs(coefficient)!r} {column}")
+            count += 1
+        if count == 0:
+            self.f.write(" 0")
+        return count
+
+
+# Row generators, one per constraint family of HealthcareSchedule.add_constraints(). Each row is
+# (name, terms, sense, rhs) with the terms an iterable of (coefficient, column).
+
+def _work_hours_rows(layout):
+    for staff_index, info in enumerate(layout.staff_info.values()):
+        work_percentage = info["work_percentage"] / 100 * layout.hours_scale
+        if info["shift"] == "Night":
+            max_hours = MAX_HOURS_NIGHT_SHIFT * (1 + NIGHT_SHIFT_TOLERANCE) * work_percentage
+            min_hours = MAX_HOURS_NIGHT_SHIFT * (1 - NIGHT_SHIFT_TOLERANCE) * work_percentage
+        else:
+            max_hours = MAX_HOURS_FULL_TIME * (1 + DAY_SHIFT_TOLERANCE) * work_percentage
+            min_hours = MAX_HOURS_FULL_TIME * (1 - DAY_SHIFT_TOLERANCE) * work_percentage
+
+        hours = layout.shift_hours[info["shift"]]
+        yield (f"max_hours_{staff_index}", ((hours, column) for _, column in layout.shifts(staff_index)),
+               "<=", max_hours)
+        yield (f"min_hours_{staff_index}", ((hours, column) for _, column in layout.shifts(staff_index)),
+               ">=", min_hours)
+
+
+def _isolated_day_rows(layout):
+    # Within each week, as in HealthcareSchedule._add_single_isolated_day_constraint()
+    last = layout.days_per_week - 1
+    for staff_index in range(len(layout.staff_info)):
+        for week in range(layout.num_weeks):
+            for day in range(layout.days_per_week):
+                day_index = week * layout.days_per_week + day
+                work, off = f"iw_{staff_index}_{day_index}", f"io_{staff_index}_{day_index}"
+                today = layout.shift(staff_index, day_index)
+                before = layout.shift(staff_index, day_index - 1) if day > 0 else None
+                after = layout.shift(staff_index, day_index + 1) if day < last else None
+                neighbours = [column for column in (before, after) if column is not None]
+
+                # isolated work >= today - before - after
+                yield (f"isolated_work_{staff_index}_{day_index}",
+                       _columns((1, work), (-1, today), *((1, column) for column in neighbours)), ">=", 0)
+                # isolated off >= (1 - today) - (1 - before) - (1 - after), for the neighbours within the week
+                neighbour_days = (day > 0) + (day < last)
+                yield (f"isolated_off_{staff_index}_{day_index}",
+                       _columns((1, off), (1, today), *((-1, column) for column in neighbours)), ">=", 1 - neighbour_days)
+
+
+def _weekend_work_rows(layout):
+    # Assuming weekend is Saturday (5) and Sunday (6)
+    for staff_index in range(len(layout.staff_info)):
+        for week in range(layout.num_weeks):
+            weekend = f"w_{staff_index}_{week}"
+            for day in (5, 6):
+                shift = layout.shift(staff_index, week * layout.days_per_week + day)
+                yield f"weekend_{staff_index}_{week}_{day}", _columns((1, weekend), (-1, shift)), ">=", 0
+
+
+def _shift_type_rows(layout):
+    for day_index in range(layout.num_days):
+        for shift_index, shift_type in enumerate(layout.shift_types):
+            staff = [staff_index for staff_index, role in enumerate(layout.roles) if role == shift_index]
+            yield (f"one_{shift_type}_{day_index}",
+                   _columns(*((1, layout.shift(staff_index, day_index)) for staff_index in staff)), "=", 1)
+
+
+def _max_days_worked_rows(layout, window=7):
+    # Windows wrap around the end of the schedule like HealthcareSchedule._window_sums()
+    for staff_index, info in enumerate(layout.staff_info.values()):
+        if info["shift"] == "D1":
+            for start in range(layout.num_days):
+                days = ((start + offset) % layout.num_days for offset in range(window))
+                yield (f"max_D1_{staff_index}_{start}",
+                       _columns(*((1, layout.shift(staff_index, day_index)) for day_index in days)),
+                       "<=", MAX_D1_DAYS_IN_7)
+
+
+def _shift_distribution_rows(layout):
+    # diff >= |own shift count - average shift count|, the average taken over every column
+    share = 1 / len(layout.staff_info)
+    for staff_index in range(len(layout.staff_info)):
+        diff = f"shift_diff_{staff_index}"
+        for sign, name in ((1, "above"), (-1, "below")):
+            terms = ((sign * ((1 if other == staff_index else 0) - share), column)
+                     for other in range(len(layout.staff_info)) for _, column in layout.shifts(other))
+            yield f"shift_diff_{name}_{staff_index}", itertools.chain([(1, diff)], _nonzero(terms)), ">=", 0
+
+
+def _objective_terms(layout, weights):
+    for staff_index in range(len(layout.staff_info)):
+        for day_index in range(layout.num_days):
+            yield -weights["isolated_days"], f"iw_{staff_index}_{day_index}"
+            yield -weights["isolated_days"], f"io_{staff_index}_{day_index}"
+    for staff_index in range(len(layout.staff_info)):
+        yield -weights["shift_distribution"], f"shift_diff_{staff_index}"
+
+
+def _binary_columns(layout):
+    pinned = layout.availability == np.array(layout.roles)[:, None] if layout.availability is not None else None
+    for staff_index in range(len(layout.staff_info)):
+        for day_index, column in layout.shifts(staff_index):
+            if pinned is None or not pinned[staff_index, day_index]:
+                yield column
+        for day_index in range(layout.num_days):
+            yield f"iw_{staff_index}_{day_index}"
+            yield f"io_{staff_index}_{day_index}"
+        for week in range(layout.num_weeks):
+            yield f"w_{staff_index}_{week}"
+
+
+def _columns(*terms):
+    # Drops the terms of columns fixed to 0 (None)
+    return [(coefficient, column) for coefficient, column in terms if column is not None]
+
+
+def _nonzero(terms):
+    return ((coefficient, column) for coefficient, column in terms if coefficient)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream the scheduling model of a roster to an LP file.")
+    parser.add_argument("roster", help="Roster file (JSON, YAML or CSV)")
+    parser.add_argument("-o", "--output", default="model.lp.gz", help="LP file to write, gzipped if it ends in .gz")
+    parser.add_argument("--weeks", type=int, default=None, help="Override the roster's number of weeks")
+    parser.add_argument("--solve", choices=["highs", "cbc"], default=None, help="Also solve the written file")
+    parser.add_argument("-t", "--time-limit", type=float, default=None, help="Solver time limit in seconds")
+    args = parser.parse_args(argv)
+
+    roster = load_roster(args.roster)
+    num_weeks = args.weeks or roster["num_weeks"]
+    availability = None
+    if roster["availability"] is not None:
+        availability = load_availability(roster["availability"], roster["staff_info"], roster["shift_hours"],
+                                         num_weeks * roster["days_per_week"])
+
+    start = time.perf_counter()
+    stats = write_model(args.output, num_weeks, roster["days_per_week"], roster["staff_info"], roster["shift_hours"],
+                        availability)
+    print(f"{stats['path']}: {stats['rows']} rows, {stats['columns']} columns, {stats['nonzeros']} nonzeros "
+          f"({time.perf_counter() - start:.1f}s)")
+
+    if args.solve:
+        start = time.perf_counter()
+        status, objective, _ = solve_model_file(args.output, args.solve, args.time_limit)
+        print(f"{args.solve}: {status} (objective {objective}, {time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
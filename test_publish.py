@@ -0,0 +1,54 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from healthcare_schedule import HealthcareSchedule
+
+
+ROSTER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rosters", "ward.json")
+
+
+class PublishTest(unittest.TestCase):
+    """
+    A schedule published while analytics or a report are being built, as the background improver does.
+    """
+
+    def setUp(self):
+        with open(ROSTER_FILE, encoding="utf-8") as f:
+            roster = json.load(f)
+        self.schedule = HealthcareSchedule(4, 7, roster["staff_info"], roster["shift_hours"], year_weeks=52)
+        shape = (len(roster["staff_info"]), 28, len(roster["shift_hours"]))
+        self.old = np.zeros(shape, dtype=np.int8)
+        self.new = np.ones(shape, dtype=np.int8)
+        self.schedule.assignment = self.old
+        self.schedule.solve_info = {"status": "Optimal", "optimal": True, "objective": 0, "best_bound": 0, "gap": 0}
+
+    def test_analytics_not_cached_for_a_replaced_schedule(self):
+        build = self.schedule._build_analytics
+
+        def publish_while_building(assignment):
+            self.schedule.assignment = self.new
+            return build(assignment)
+
+        with mock.patch.object(self.schedule, "_build_analytics", side_effect=publish_while_building):
+            self.assertIs(self.schedule.analytics.assignment, self.old)
+        self.assertIs(self.schedule.analytics.assignment, self.new)
+
+    def test_report_uses_one_schedule(self):
+        rendered = []
+
+        def publish_then_render(report, output, path, announce=True):
+            self.schedule.assignment = self.new
+            rendered.append(report.analytics.assignment)
+
+        with mock.patch("reporting._render_with", side_effect=publish_then_render):
+            self.schedule.generate_report(outputs=("plot", "excel"), parallel=False)
+        self.assertEqual(len(rendered), 2)
+        self.assertTrue(all(assignment is self.old for assignment in rendered))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+from service import make_server
+
+
+ROSTER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rosters", "ward.json")
+
+
+class ServiceTest(unittest.TestCase):
+    """
+    Submits a roster to the service on localhost, polls it and fetches the results.
+    """
+
+    def setUp(self):
+        self.store = tempfile.TemporaryDirectory()
+        self.server = make_server("127.0.0.1", 0, self.store.name, max_workers=1)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.RequestHandlerClass.service.shutdown()
+        self.server.server_close()
+        self.store.cleanup()
+
+    def request(self, method, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, response.read()
+
+    def test_submit_poll_fetch(self):
+        with open(ROSTER_FILE, encoding="utf-8") as f:
+            roster = json.load(f)
+        payload = {"roster": roster, "backend": "highs", "time_limit": 60}
+
+        code, body = self.request("POST", "/jobs", payload)
+        self.assertEqual(code, 202)
+        job_id = json.loads(body)["id"]
+
+        deadline = time.time() + 120
+        while True:
+            job = json.loads(self.request("GET", f"/jobs/{job_id}")[1])
+            if job["status"] not in ("queued", "running") or time.time() > deadline:
+                break
+            time.sleep(0.5)
+        self.assertEqual(job["status"], "done", job.get("error"))
+
+        result = json.loads(self.request("GET", f"/jobs/{job_id}/result.json")[1])
+        self.assertEqual(result["name"], "ward")
+        self.assertEqual(len(result["schedule"]), len(roster["staff_info"]))
+        code, body = self.request("GET", f"/jobs/{job_id}/result.xlsx")
+        self.assertEqual(code, 200)
+        self.assertTrue(body.startswith(b"PK"))
+        code, body = self.request("GET", f"/jobs/{job_id}/result.png")
+        self.assertTrue(body.startswith(b"\x89PNG"))
+
+        # The same roster again returns the finished job instead of solving it again
+        code, body = self.request("POST", "/jobs", payload)
+        self.assertEqual(code, 200)
+        self.assertTrue(json.loads(body)["deduplicated"])
+
+    def test_availability_file_rejected(self):
+        with open(ROSTER_FILE, encoding="utf-8") as f:
+            roster = json.load(f)
+        roster["availability"] = "availability/ward.csv"
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.request("POST", "/jobs", {"roster": roster})
+        self.assertEqual(raised.exception.code, 400)
+        self.assertEqual(self.request("GET", "/jobs")[1], b"[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
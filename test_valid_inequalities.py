@@ -0,0 +1,48 @@
+import json
+import os
+import unittest
+
+from healthcare_schedule import HealthcareSchedule
+
+
+ROSTER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rosters")
+
+
+def load(name):
+    with open(os.path.join(ROSTER_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ValidInequalitiesTest(unittest.TestCase):
+    def build(self, staff_info, shift_hours, num_weeks=52, year_weeks=None):
+        schedule = HealthcareSchedule(num_weeks, 7, staff_info, shift_hours, year_weeks=year_weeks)
+        schedule.add_constraints()
+        return schedule
+
+    def test_shift_count_bounds(self):
+        roster = load("ward.json")
+        schedule = self.build(roster["staff_info"], roster["shift_hours"])
+        rows = schedule.add_valid_inequalities()
+        self.assertIn("Cut_Shift_Imbalance", rows)
+        for low, high in schedule.shift_count_bounds.values():
+            self.assertLessEqual(low, high)
+
+    def test_pool_that_cannot_cover_its_shifts(self):
+        # Three D2 staff at 50 % can't do a D2 shift every day of a 4-week cycle
+        roster = load("ward.json")
+        staff_info = {name: dict(info, work_percentage=50) if info["shift"] == "D2" else info
+                      for name, info in roster["staff_info"].items()}
+        schedule = self.build(staff_info, roster["shift_hours"], num_weeks=4, year_weeks=52)
+        with self.assertRaisesRegex(ValueError, "Pool D2 cannot cover its shifts"):
+            schedule.add_valid_inequalities()
+
+    def test_two_member_pool(self):
+        roster = load("ask2.json")
+        schedule = self.build(roster["staff_info"], roster["shift_hours"])
+        with self.assertRaisesRegex(ValueError, "Pool D2 cannot cover its shifts"):
+            schedule.add_valid_inequalities()
+        self.assertFalse(any(name.startswith("Cut_") for name in schedule.problem.constraints))
+
+
+if __name__ == "__main__":
+    unittest.main()